@@ -2,9 +2,12 @@
 API routes for Formula Intelligence.
 """
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Request
+from fastapi.responses import JSONResponse, Response
 from typing import Optional
+import asyncio
+import io
+import orjson
 import uuid
 import os
 import time
@@ -14,28 +17,44 @@ from ..models import (
     AnalysisRequest,
     AnalysisResult,
     AnalysisStatus,
+    AnomalySummary,
+    CostDriverSummary,
     DependencyQuery,
     DependencyResponse,
+    GraphData,
     HealthCheck,
+    MetricsSummary,
 )
-from ..services import analysis_service
+from ..services import analysis_service, JobStore, get_job_store
 from ..utils import settings, get_logger
 
 logger = get_logger(__name__)
 router = APIRouter()
 
-# In-memory job storage (in production, use Redis or database)
-jobs = {}
+# Buffer size used when streaming uploads to disk (64KB)
+UPLOAD_CHUNK_SIZE = 1 << 16
+
+# Minimum seconds between progress writes to the job store
+PROGRESS_UPDATE_INTERVAL = 0.1
+
+# Schemas of the sections of a completed result (see AnalysisResult)
+RESULT_SECTION_MODELS = {
+    "graph": GraphData,
+    "metrics": MetricsSummary,
+    "anomalies": AnomalySummary,
+    "cost_drivers": CostDriverSummary,
+}
 
 
 @router.post("/analyze", response_model=AnalysisStatus)
 async def analyze_file(
-    background_tasks: BackgroundTasks,
+    request: Request,
     file: UploadFile = File(...),
     include_values: bool = False,
     detect_anomalies: bool = True,
     identify_cost_drivers: bool = True,
     top_drivers_count: int = 50,
+    job_store: JobStore = Depends(get_job_store),
 ):
     """
     Upload and analyze an Excel file.
@@ -44,34 +63,35 @@ async def analyze_file(
     Returns a job ID that can be used to check status and retrieve results.
     """
     # Validate file
-    if not file.filename.endswith(tuple(settings.ALLOWED_EXTENSIONS)):
+    if os.path.splitext(file.filename)[1] not in settings.ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid file type. Allowed: {settings.ALLOWED_EXTENSIONS}"
-        )
-    
-    # Check file size
-    file_content = await file.read()
-    file_size = len(file_content)
-    
-    if file_size > settings.MAX_FILE_SIZE_MB * 1024 * 1024:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Maximum size: {settings.MAX_FILE_SIZE_MB}MB"
+            detail=f"Invalid file type. Allowed: {', '.join(sorted(settings.ALLOWED_EXTENSIONS))}"
         )
     
     # Generate job ID
     job_id = str(uuid.uuid4())
     
-    # Save file temporarily
+    # Save file temporarily, enforcing the size limit while copying
     os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
     file_path = os.path.join(settings.UPLOAD_DIR, f"{job_id}_{file.filename}")
     
-    with open(file_path, "wb") as f:
-        f.write(file_content)
+    try:
+        file_size = await save_upload(file, file_path)
+    except HTTPException:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+    
+    params = {
+        "include_values": include_values,
+        "detect_anomalies": detect_anomalies,
+        "identify_cost_drivers": identify_cost_drivers,
+        "top_drivers_count": top_drivers_count,
+    }
     
     # Create job record
-    jobs[job_id] = {
+    await job_store.create(job_id, {
         "job_id": job_id,
         "status": "processing",
         "progress": 0,
@@ -79,19 +99,20 @@ async def analyze_file(
         "file_name": file.filename,
         "file_size": file_size,
         "file_path": file_path,
+        "params": params,
         "created_at": datetime.now(),
-    }
+    })
     
-    # Start background processing
-    background_tasks.add_task(
-        process_analysis,
-        job_id=job_id,
-        file_path=file_path,
-        include_values=include_values,
-        detect_anomalies=detect_anomalies,
-        identify_cost_drivers=identify_cost_drivers,
-        top_drivers_count=top_drivers_count,
-    )
+    # Start processing, either on a queue worker or on the app's scheduler
+    if job_store.uses_queue:
+        await job_store.enqueue(job_id)
+    else:
+        await request.app.state.scheduler.spawn(process_analysis(
+            job_store=job_store,
+            job_id=job_id,
+            file_path=file_path,
+            **params,
+        ))
     
     logger.info(
         "Analysis job created",
@@ -109,6 +130,7 @@ async def analyze_file(
 
 
 async def process_analysis(
+    job_store: JobStore,
     job_id: str,
     file_path: str,
     include_values: bool,
@@ -117,12 +139,28 @@ async def process_analysis(
     top_drivers_count: int,
 ):
     """Background task to process analysis."""
+    # Progress writes are scheduled from the synchronous callback; keep
+    # references so they can be awaited before the final status update.
+    pending_updates = set()
+    last_update = 0.0
+    
+    def on_progress(progress: int, message: str) -> None:
+        # Coalesce high-frequency updates; the final update always goes through
+        nonlocal last_update
+        now = time.monotonic()
+        if progress < 100 and now - last_update < PROGRESS_UPDATE_INTERVAL:
+            return
+        last_update = now
+        
+        task = asyncio.ensure_future(update_progress(job_store, job_id, progress, message))
+        pending_updates.add(task)
+        task.add_done_callback(pending_updates.discard)
+    
     try:
         start_time = time.time()
         
         # Update progress
-        jobs[job_id]["progress"] = 10
-        jobs[job_id]["message"] = "Reading Excel file"
+        await update_progress(job_store, job_id, 10, "Reading Excel file")
         
         # Run analysis
         result = await analysis_service.analyze_workbook(
@@ -131,20 +169,29 @@ async def process_analysis(
             detect_anomalies=detect_anomalies,
             identify_cost_drivers=identify_cost_drivers,
             top_drivers_count=top_drivers_count,
-            progress_callback=lambda p, m: update_progress(job_id, p, m)
+            progress_callback=on_progress,
+            graph_as_json=True
         )
         
         processing_time = time.time() - start_time
         
+        # Completed results are served without going through pydantic, so
+        # they are checked against the schema once here
+        await asyncio.to_thread(validate_result, result)
+        
+        if pending_updates:
+            await asyncio.gather(*pending_updates)
+        
         # Update job with results
-        jobs[job_id].update({
-            "status": "completed",
-            "progress": 100,
-            "message": "Analysis complete",
-            "result": result,
-            "completed_at": datetime.now(),
-            "processing_time": processing_time,
-        })
+        await job_store.update(
+            job_id,
+            status="completed",
+            progress=100,
+            message="Analysis complete",
+            result=result,
+            completed_at=datetime.now(),
+            processing_time=processing_time,
+        )
         
         logger.info(
             "Analysis completed",
@@ -154,11 +201,14 @@ async def process_analysis(
         
     except Exception as e:
         logger.error("Analysis failed", job_id=job_id, error=str(e))
-        jobs[job_id].update({
-            "status": "failed",
-            "message": f"Analysis failed: {str(e)}",
-            "error": str(e),
-        })
+        if pending_updates:
+            await asyncio.gather(*pending_updates, return_exceptions=True)
+        await job_store.update(
+            job_id,
+            status="failed",
+            message=f"Analysis failed: {str(e)}",
+            error=str(e),
+        )
     finally:
         # Clean up file
         try:
@@ -167,25 +217,88 @@ async def process_analysis(
             pass
 
 
-def update_progress(job_id: str, progress: int, message: str):
+async def update_progress(job_store: JobStore, job_id: str, progress: int, message: str):
     """Update job progress."""
-    if job_id in jobs:
-        jobs[job_id]["progress"] = progress
-        jobs[job_id]["message"] = message
+    await job_store.update(job_id, progress=progress, message=message)
+
+
+def _file_too_large() -> HTTPException:
+    # 400 like the other upload validation errors (and main.limit_upload_size)
+    return HTTPException(
+        status_code=400,
+        detail=f"File too large. Maximum size: {settings.MAX_FILE_SIZE_MB}MB"
+    )
+
+
+def _sendfile_copy(src, file_path: str, size: int) -> None:
+    """
+    Copy an open file to file_path kernel-to-kernel with os.sendfile.
+    
+    Raises OSError if the source ends before size bytes were copied.
+    """
+    in_fd = src.fileno()
+    with open(file_path, "wb") as dest:
+        out_fd = dest.fileno()
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(out_fd, in_fd, offset, size - offset)
+            if sent == 0:
+                raise OSError(f"sendfile stopped after {offset} of {size} bytes")
+            offset += sent
+
+
+async def save_upload(file: UploadFile, file_path: str) -> int:
+    """
+    Save an uploaded file to disk and return its size in bytes.
+    
+    Starlette spools uploads to a temporary file, so when that file can be
+    backed by a real descriptor the bytes are copied with os.sendfile in a
+    worker thread. Otherwise the upload is streamed in fixed-size chunks.
+    Raises HTTPException if the file exceeds MAX_FILE_SIZE_MB.
+    """
+    max_size = settings.MAX_FILE_SIZE_MB * 1024 * 1024
+    src = file.file
+    
+    try:
+        # Force the spooled upload onto disk so it has a file descriptor
+        if hasattr(src, "rollover"):
+            src.rollover()
+        src.seek(0, os.SEEK_END)
+        size = src.tell()
+        if size > max_size:
+            raise _file_too_large()
+        src.seek(0)
+        
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, _sendfile_copy, src, file_path, size)
+        return size
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        pass
+    
+    # Fallback: stream in chunks, aborting as soon as the limit is exceeded
+    await file.seek(0)
+    file_size = 0
+    with open(file_path, "wb") as f:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            file_size += len(chunk)
+            if file_size > max_size:
+                raise _file_too_large()
+            f.write(chunk)
+    
+    return file_size
 
 
 @router.get("/analysis/{job_id}", response_model=AnalysisResult)
-async def get_analysis_result(job_id: str):
+async def get_analysis_result(job_id: str, job_store: JobStore = Depends(get_job_store)):
     """
     Get analysis results for a job.
     
     Returns the complete analysis including graph, anomalies, and cost drivers.
     """
-    if job_id not in jobs:
+    job = await job_store.get(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job = jobs[job_id]
-    
     if job["status"] == "processing":
         return AnalysisResult(
             job_id=job_id,
@@ -205,32 +318,72 @@ async def get_analysis_result(job_id: str):
             error=job.get("error"),
         )
     
-    # Return completed result
+    # Return completed result. It was validated against AnalysisResult when
+    # the job finished, so it is serialized directly instead of validating
+    # every node and edge through pydantic again on each request.
+    return Response(
+        content=orjson.dumps(
+            completed_payload(job_id, job), option=orjson.OPT_NON_STR_KEYS
+        ),
+        media_type="application/json",
+    )
+
+
+def completed_payload(job_id: str, job: dict) -> dict:
+    """
+    Build the AnalysisResult document of a completed job.
+    
+    Args:
+        job_id: Job identifier
+        job: Job record from the job store
+        
+    Returns:
+        Dictionary in the AnalysisResult shape, ready for orjson
+    """
     result = job.get("result", {})
     
-    return AnalysisResult(
-        job_id=job_id,
-        status="completed",
-        created_at=job["created_at"],
-        completed_at=job.get("completed_at"),
-        file_name=job["file_name"],
-        file_size=job["file_size"],
-        graph=result.get("graph"),
-        metrics=result.get("metrics"),
-        anomalies=result.get("anomalies"),
-        cost_drivers=result.get("cost_drivers"),
-        processing_time=job.get("processing_time"),
-    )
+    return {
+        "job_id": job_id,
+        "status": "completed",
+        "created_at": job["created_at"],
+        "completed_at": job.get("completed_at"),
+        "file_name": job["file_name"],
+        "file_size": job["file_size"],
+        "graph": result.get("graph"),
+        "metrics": result.get("metrics"),
+        "anomalies": result.get("anomalies"),
+        "cost_drivers": result.get("cost_drivers"),
+        "error": None,
+        "processing_time": job.get("processing_time"),
+    }
+
+
+def validate_result(result: dict) -> None:
+    """
+    Validate the sections of an analysis result against their schemas.
+    
+    Sections are validated from their JSON encoding, which is what clients
+    receive; the graph may already be an orjson.Fragment.
+    
+    Args:
+        result: Result returned by analysis_service.analyze_workbook
+        
+    Raises:
+        pydantic.ValidationError: If a section does not match its schema
+    """
+    for name, model in RESULT_SECTION_MODELS.items():
+        section = result.get(name)
+        if section is not None:
+            model.model_validate_json(orjson.dumps(section, option=orjson.OPT_NON_STR_KEYS))
 
 
 @router.get("/analysis/{job_id}/status", response_model=AnalysisStatus)
-async def get_analysis_status(job_id: str):
+async def get_analysis_status(job_id: str, job_store: JobStore = Depends(get_job_store)):
     """Get current status of an analysis job."""
-    if job_id not in jobs:
+    job = await job_store.get(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job = jobs[job_id]
-    
     return AnalysisStatus(
         job_id=job_id,
         status=job["status"],
@@ -240,16 +393,21 @@ async def get_analysis_status(job_id: str):
 
 
 @router.post("/dependencies", response_model=DependencyResponse)
-async def get_dependencies(query: DependencyQuery, job_id: str):
+async def get_dependencies(
+    query: DependencyQuery,
+    job_id: str,
+    job_store: JobStore = Depends(get_job_store),
+):
     """
     Get dependencies for a specific cell.
     
     Requires a completed analysis job ID.
     """
-    if job_id not in jobs or jobs[job_id]["status"] != "completed":
+    job = await job_store.get(job_id)
+    if job is None or job["status"] != "completed":
         raise HTTPException(status_code=400, detail="Analysis not completed")
     
-    result = jobs[job_id].get("result", {})
+    result = job.get("result", {})
     graph_data = result.get("graph")
     
     if not graph_data:
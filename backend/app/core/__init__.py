@@ -1,7 +1,7 @@
 """Core package initialization."""
 
 from .parser import FormulaParser, CellReference, Token, TokenType
-from .dag_builder import DAGBuilder, GraphNode, GraphEdge
+from .dag_builder import DAGBuilder, GraphNode, GraphEdge, shutdown_parse_executor
 from .anomaly_detector import AnomalyDetector, Anomaly, AnomalyType
 from .cost_driver_analyzer import CostDriverAnalyzer, CostDriver
 
@@ -13,6 +13,7 @@ __all__ = [
     "DAGBuilder",
     "GraphNode",
     "GraphEdge",
+    "shutdown_parse_executor",
     "AnomalyDetector",
     "Anomaly",
     "AnomalyType",
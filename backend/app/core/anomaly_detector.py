@@ -8,14 +8,28 @@ Detects:
 - Pattern deviations using Graph Neural Networks
 """
 
+import re
 import networkx as nx
+import numpy as np
+from bisect import bisect_right
+from itertools import accumulate, chain, islice
 from typing import List, Dict, Set, Any, Optional
 from dataclasses import dataclass
 from enum import Enum
 from ..utils import get_logger
+from .dag_builder import DAGBuilder
 
 logger = get_logger(__name__)
 
+# Maximum number of cycles enumerated inside one strongly connected component
+MAX_CYCLES_PER_SCC = 100
+
+# Maximum number of circular reference anomalies reported per analysis
+MAX_CYCLE_ANOMALIES = 10000
+
+# Excel error values: #REF!, #NAME!, #VALUE!, #DIV/0!, #N/A, #NUM!
+ERROR_VALUE_PATTERN = re.compile(r"#(?:REF!|NAME!|VALUE!|DIV/0!|N/A|NUM!)")
+
 
 class AnomalyType(Enum):
     """Types of anomalies that can be detected."""
@@ -27,7 +41,7 @@ class AnomalyType(Enum):
     MISSING_DEPENDENCY = "missing_dependency"
 
 
-@dataclass
+@dataclass(slots=True)
 class Anomaly:
     """Represents a detected anomaly."""
     type: AnomalyType
@@ -56,8 +70,8 @@ class AnomalyDetector:
     Detects various anomalies in Excel workbooks.
     """
     
-    def __init__(self, graph: nx.DiGraph):
-        self.graph = graph
+    def __init__(self, builder: DAGBuilder):
+        self.builder = builder
         self.logger = logger.bind(component="AnomalyDetector")
         self.anomalies: List[Anomaly] = []
     
@@ -73,14 +87,14 @@ class AnomalyDetector:
         """
         self.logger.info("Starting anomaly detection")
         
-        self.anomalies = []
-        
         # Run different detection methods
-        self._detect_broken_references(sheets_data)
-        self._detect_unused_formulas()
-        self._detect_circular_references()
-        self._detect_hard_coded_overwrites(sheets_data)
-        self._detect_missing_dependencies()
+        results = [
+            self._detect_broken_references(sheets_data),
+            self._detect_unused_formulas(),
+            self._detect_circular_references(),
+            self._detect_hard_coded_overwrites(sheets_data),
+        ]
+        self.anomalies = list(chain.from_iterable(results))
         
         self.logger.info(
             "Anomaly detection complete",
@@ -90,133 +104,180 @@ class AnomalyDetector:
         
         return self.anomalies
     
-    def _detect_broken_references(self, sheets_data: List[Dict[str, Any]]) -> None:
+    def _detect_broken_references(self, sheets_data: List[Dict[str, Any]]) -> List[Anomaly]:
         """Detect cells with error values like #REF!, #NAME!."""
-        error_patterns = ['#REF!', '#NAME!', '#VALUE!', '#DIV/0!', '#N/A', '#NUM!']
+        anomalies: List[Anomaly] = []
+        append = anomalies.append
+        anomaly_type = AnomalyType.BROKEN_REFERENCE
         
         for sheet_data in sheets_data:
             sheet_name = sheet_data['name']
-            cells = sheet_data['cells']
+            cols = sheet_data['cols']
             
-            for cell in cells:
-                value = str(cell.get('value', ''))
+            if not cols:
+                continue
+            
+            # Scan all values of the sheet in one pass over a joined buffer,
+            # then map match offsets back to cell indices
+            values = [
+                value if isinstance(value, str) else ("" if value is None else str(value))
+                for value in sheet_data['values']
+            ]
+            matches = list(ERROR_VALUE_PATTERN.finditer("\x00".join(values)))
+            if not matches:
+                continue
+            
+            # Only sheets containing errors pay for the offset table
+            offsets = list(accumulate((len(v) + 1 for v in values[:-1]), initial=0))
+            
+            last_idx = -1
+            for match in matches:
+                idx = bisect_right(offsets, match.start()) - 1
+                if idx == last_idx:
+                    continue
+                last_idx = idx
                 
-                if any(error in value for error in error_patterns):
-                    self.anomalies.append(Anomaly(
-                        type=AnomalyType.BROKEN_REFERENCE,
-                        severity='high',
-                        cell_address=f"{sheet_name}!{cell.get('col')}{cell.get('row')}",
-                        sheet=sheet_name,
-                        description=f"Cell contains error value: {value}",
-                        suggestion="Check formula references and ensure all referenced cells exist",
-                        metadata={"error_value": value}
-                    ))
+                value = values[idx]
+                append(Anomaly(
+                    type=anomaly_type,
+                    severity='high',
+                    cell_address=f"{sheet_name}!{cols[idx]}{int(sheet_data['rows'][idx])}",
+                    sheet=sheet_name,
+                    description=f"Cell contains error value: {value}",
+                    suggestion="Check formula references and ensure all referenced cells exist",
+                    metadata={"error_value": value}
+                ))
+        
+        return anomalies
     
-    def _detect_unused_formulas(self) -> None:
+    def _detect_unused_formulas(self) -> List[Anomaly]:
         """Detect formulas that are never used by other cells (dead logic)."""
-        for node_id in self.graph.nodes():
-            node_data = self.graph.nodes[node_id]
-            
-            # Check if node has a formula but no dependents
-            if node_data.get('has_formula', False):
-                out_degree = self.graph.out_degree(node_id)
-                
-                if out_degree == 0:
-                    # This is a formula cell with no dependents
-                    self.anomalies.append(Anomaly(
-                        type=AnomalyType.UNUSED_FORMULA,
-                        severity='low',
-                        cell_address=node_id,
-                        sheet=node_data.get('sheet', ''),
-                        description="Formula is not used by any other cell",
-                        suggestion="Consider removing this formula if it's not needed for output",
-                        metadata={"formula": node_data.get('formula', '')[:100]}
-                    ))
+        anomalies: List[Anomaly] = []
+        masks = self.builder.get_node_masks()
+        
+        # Formula cells with no dependents
+        for node_id in np.flatnonzero(masks['has_formula'] & masks['is_output']).tolist():
+            node = self.builder.get_node(node_id)
+            anomalies.append(Anomaly(
+                type=AnomalyType.UNUSED_FORMULA,
+                severity='low',
+                cell_address=node.address,
+                sheet=node.sheet,
+                description="Formula is not used by any other cell",
+                suggestion="Consider removing this formula if it's not needed for output",
+                metadata={"formula": node.formula[:100]}
+            ))
+        
+        return anomalies
     
-    def _detect_circular_references(self) -> None:
-        """Detect circular reference cycles."""
+    def _detect_circular_references(self) -> List[Anomaly]:
+        """
+        Detect circular reference cycles.
+        
+        The builder already grouped the cells on cycles by strongly connected
+        component, so acyclic workbooks cost nothing here. Cycles are only
+        enumerated inside those components, capped at MAX_CYCLES_PER_SCC each.
+        """
+        anomalies: List[Anomaly] = []
+        
         try:
-            cycles = list(nx.simple_cycles(self.graph))
+            cycles = []
+            for members in self.builder.get_cycles():
+                if members.size == 1:
+                    # A cell that references itself
+                    cycles.append(members.tolist())
+                    continue
+                
+                component = self.builder.adjacency[members][:, members]
+                subgraph = nx.from_scipy_sparse_array(component, create_using=nx.DiGraph)
+                cycles.extend(
+                    members[cycle].tolist()
+                    for cycle in islice(nx.simple_cycles(subgraph), MAX_CYCLES_PER_SCC)
+                )
             
             for cycle in cycles:
-                # Create anomaly for each cell in the cycle
-                cycle_str = " → ".join(cycle) + f" → {cycle[0]}"
+                if len(anomalies) >= MAX_CYCLE_ANOMALIES:
+                    break
                 
-                for cell_address in cycle:
-                    node_data = self.graph.nodes[cell_address]
-                    
-                    self.anomalies.append(Anomaly(
+                # Create anomaly for each cell in the cycle, sharing the
+                # description and (read-only) metadata across the cycle
+                nodes = [self.builder.get_node(node_id) for node_id in cycle]
+                addresses = [node.address for node in nodes]
+                cycle_str = " → ".join(addresses) + f" → {addresses[0]}"
+                description = f"Part of circular reference: {cycle_str}"
+                metadata = {"cycle": tuple(addresses)}
+                
+                for node in nodes:
+                    anomalies.append(Anomaly(
                         type=AnomalyType.CIRCULAR_REFERENCE,
                         severity='critical',
-                        cell_address=cell_address,
-                        sheet=node_data.get('sheet', ''),
-                        description=f"Part of circular reference: {cycle_str}",
+                        cell_address=node.address,
+                        sheet=node.sheet,
+                        description=description,
                         suggestion="Break the circular dependency by restructuring formulas",
-                        metadata={"cycle": cycle}
+                        metadata=metadata
                     ))
         except Exception as e:
             self.logger.error("Error detecting cycles", error=str(e))
+        
+        return anomalies
     
-    def _detect_hard_coded_overwrites(self, sheets_data: List[Dict[str, Any]]) -> None:
+    def _detect_hard_coded_overwrites(self, sheets_data: List[Dict[str, Any]]) -> List[Anomaly]:
         """
         Detect cells that should have formulas but contain hard-coded values.
         
         This is a heuristic check based on patterns in surrounding cells.
         """
+        # Imported on first use to keep application startup fast
+        import pandas as pd
+        
+        anomalies: List[Anomaly] = []
+        append = anomalies.append
+        anomaly_type = AnomalyType.HARD_CODED_OVERWRITE
+        
         for sheet_data in sheets_data:
             sheet_name = sheet_data['name']
-            cells = sheet_data['cells']
             
-            # Group cells by row
-            rows = {}
-            for cell in cells:
-                row = cell.get('row', 0)
-                if row not in rows:
-                    rows[row] = []
-                rows[row].append(cell)
+            if not sheet_data['cols']:
+                continue
             
-            # Check each row for patterns
-            for row_num, row_cells in rows.items():
-                formula_count = sum(1 for c in row_cells if c.get('formula'))
-                value_count = sum(1 for c in row_cells if not c.get('formula') and c.get('value'))
-                
-                # If most cells in row have formulas, flag the ones that don't
-                if formula_count > 3 and value_count > 0:
-                    for cell in row_cells:
-                        if not cell.get('formula') and cell.get('value'):
-                            # This might be a hard-coded overwrite
-                            self.anomalies.append(Anomaly(
-                                type=AnomalyType.HARD_CODED_OVERWRITE,
-                                severity='medium',
-                                cell_address=f"{sheet_name}!{cell.get('col')}{cell.get('row')}",
-                                sheet=sheet_name,
-                                description="Cell contains hard-coded value in a row of formulas",
-                                suggestion="Verify if this should be a formula instead of a hard-coded value",
-                                metadata={
-                                    "value": str(cell.get('value')),
-                                    "row_formula_count": formula_count
-                                }
-                            ))
-    
-    def _detect_missing_dependencies(self) -> None:
-        """Detect cells that reference non-existent cells."""
-        for node_id in self.graph.nodes():
-            # Check if any predecessors don't exist in the graph
-            predecessors = list(self.graph.predecessors(node_id))
+            # The sheet is already columnar, so the frame wraps its arrays
+            df = pd.DataFrame({
+                'row': sheet_data['rows'],
+                'col': sheet_data['cols'],
+                'value': sheet_data['values'],
+                'formula': sheet_data['formulas'],
+            })
+            df['has_formula'] = df['formula'].fillna('').astype(bool)
+            df['has_value'] = df['value'].fillna('').astype(bool) & ~df['has_formula']
             
-            for pred in predecessors:
-                if pred not in self.graph.nodes():
-                    node_data = self.graph.nodes[node_id]
-                    
-                    self.anomalies.append(Anomaly(
-                        type=AnomalyType.MISSING_DEPENDENCY,
-                        severity='high',
-                        cell_address=node_id,
-                        sheet=node_data.get('sheet', ''),
-                        description=f"References non-existent cell: {pred}",
-                        suggestion="Check if the referenced cell was deleted or moved",
-                        metadata={"missing_cell": pred}
-                    ))
+            # Count formulas and hard-coded values per row
+            counts = df.groupby('row')[['has_formula', 'has_value']].sum()
+            
+            # If most cells in row have formulas, flag the ones that don't
+            bad_rows = counts.index[(counts['has_formula'] > 3) & (counts['has_value'] > 0)]
+            if bad_rows.empty:
+                continue
+            
+            flagged = df[df['row'].isin(bad_rows) & df['has_value']]
+            formula_counts = counts['has_formula']
+            
+            for row, col, value in zip(flagged['row'], flagged['col'], flagged['value']):
+                # This might be a hard-coded overwrite
+                append(Anomaly(
+                    type=anomaly_type,
+                    severity='medium',
+                    cell_address=f"{sheet_name}!{col}{row}",
+                    sheet=sheet_name,
+                    description="Cell contains hard-coded value in a row of formulas",
+                    suggestion="Verify if this should be a formula instead of a hard-coded value",
+                    metadata={
+                        "value": str(value),
+                        "row_formula_count": int(formula_counts[row])
+                    }
+                ))
+        
+        return anomalies
     
     def _count_by_type(self) -> Dict[str, int]:
         """Count anomalies by type."""
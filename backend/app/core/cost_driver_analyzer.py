@@ -5,15 +5,25 @@ Uses graph algorithms like betweenness centrality and clustering to identify
 cells that have the most impact on the overall budget/cost structure.
 """
 
+import heapq
 import networkx as nx
-from typing import List, Dict, Set, Any, Tuple, Optional
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from typing import List, Dict, FrozenSet, Any, Optional
 from dataclasses import dataclass
 from ..utils import get_logger
+from .dag_builder import DAGBuilder, GraphNode
 
 logger = get_logger(__name__)
 
+# PageRank power iteration parameters (same defaults as nx.pagerank)
+PAGERANK_ALPHA = 0.85
+PAGERANK_MAX_ITER = 100
+PAGERANK_TOL = 1.0e-6
 
-@dataclass
+
+@dataclass(slots=True)
 class CostDriver:
     """Represents a cost driver cell."""
     cell_address: str
@@ -41,6 +51,11 @@ class CostDriver:
         }
 
 
+def _driver_score(driver: CostDriver) -> float:
+    """Combined ranking score (centrality + impact)."""
+    return driver.centrality_score + driver.impact_score
+
+
 class CostDriverAnalyzer:
     """
     Analyzes dependency graph to identify cost drivers.
@@ -51,11 +66,15 @@ class CostDriverAnalyzer:
     3. Are input nodes (raw assumptions/parameters)
     """
     
-    def __init__(self, graph: nx.DiGraph):
-        self.graph = graph
+    def __init__(self, builder: DAGBuilder):
+        self.builder = builder
         self.logger = logger.bind(component="CostDriverAnalyzer")
+        # Indexed by node ID once analyze has run
         self.cost_drivers: List[CostDriver] = []
-        self.clusters: Dict[int, List[str]] = {}
+        self.clusters: Dict[int, FrozenSet[str]] = {}
+        self._cluster_members: List[np.ndarray] = []
+        self._cluster_labels: np.ndarray = np.zeros(0, dtype=np.int32)
+        self._desc_counts: np.ndarray = np.zeros(0, dtype=np.int64)
     
     def analyze(self, top_n: int = 50) -> List[CostDriver]:
         """
@@ -69,50 +88,44 @@ class CostDriverAnalyzer:
         """
         self.logger.info("Starting cost driver analysis")
         
+        # Count transitive dependents once for all nodes
+        self._desc_counts = self._compute_descendant_counts()
+        
         # Compute centrality metrics
-        centrality_scores = self._compute_betweenness_centrality()
+        centrality_scores = self._compute_betweenness_centrality().tolist()
         
         # Compute impact scores
-        impact_scores = self._compute_impact_scores()
+        impact_scores = self._compute_impact_scores().tolist()
         
         # Identify clusters
         self._identify_clusters()
         
         # Create CostDriver objects
         self.cost_drivers = []
+        dependent_counts = self._desc_counts.tolist()
+        cluster_labels = self._cluster_labels.tolist()
         
-        for node_id in self.graph.nodes():
-            node_data = self.graph.nodes[node_id]
-            
-            # Get dependent count
-            dependent_count = len(list(nx.descendants(self.graph, node_id)))
-            
-            # Find cluster
-            cluster_id = self._get_node_cluster(node_id)
+        for node_id in range(len(self.builder.addresses)):
+            node = self.builder.get_node(node_id)
             
             # Create cost driver
             driver = CostDriver(
-                cell_address=node_id,
-                sheet=node_data.get('sheet', ''),
-                col=node_data.get('col', ''),
-                row=node_data.get('row', 0),
-                centrality_score=centrality_scores.get(node_id, 0.0),
-                impact_score=impact_scores.get(node_id, 0.0),
-                dependent_count=dependent_count,
-                cluster_id=cluster_id,
-                description=self._generate_description(node_id, node_data)
+                cell_address=node.address,
+                sheet=node.sheet,
+                col=node.col,
+                row=node.row,
+                centrality_score=centrality_scores[node_id],
+                impact_score=impact_scores[node_id],
+                dependent_count=dependent_counts[node_id],
+                cluster_id=cluster_labels[node_id],
+                description=self._generate_description(node, dependent_counts[node_id])
             )
             
             self.cost_drivers.append(driver)
         
-        # Sort by combined score (centrality + impact)
-        self.cost_drivers.sort(
-            key=lambda d: d.centrality_score + d.impact_score,
-            reverse=True
-        )
-        
-        # Return top N
-        top_drivers = self.cost_drivers[:top_n]
+        # Select top N by combined score (centrality + impact) without
+        # sorting every node
+        top_drivers = heapq.nlargest(top_n, self.cost_drivers, key=_driver_score)
         
         self.logger.info(
             "Cost driver analysis complete",
@@ -122,7 +135,16 @@ class CostDriverAnalyzer:
         
         return top_drivers
     
-    def _compute_betweenness_centrality(self) -> Dict[str, float]:
+    def _compute_descendant_counts(self) -> np.ndarray:
+        """
+        Count the transitive dependents of every node in one sweep.
+        
+        Uses the builder's bounded-memory reach-count pass, which is cached
+        and shared with its impact scores.
+        """
+        return self.builder.compute_dependent_counts()
+    
+    def _compute_betweenness_centrality(self) -> np.ndarray:
         """
         Compute centrality for all nodes using PageRank.
         
@@ -132,65 +154,76 @@ class CostDriverAnalyzer:
         """
         try:
             # Use PageRank for DAGs - it's more meaningful than betweenness
-            centrality = nx.pagerank(self.graph, alpha=0.85)
+            centrality = self._pagerank(alpha=PAGERANK_ALPHA)
             
             # Log some statistics
-            if centrality:
-                max_score = max(centrality.values())
-                min_score = min(centrality.values())
-                avg_score = sum(centrality.values()) / len(centrality)
+            if centrality.size:
                 self.logger.debug(
                     "Computed PageRank centrality",
-                    node_count=len(centrality),
-                    max_score=round(max_score, 4),
-                    min_score=round(min_score, 4),
-                    avg_score=round(avg_score, 4)
+                    node_count=centrality.size,
+                    max_score=round(float(centrality.max()), 4),
+                    min_score=round(float(centrality.min()), 4),
+                    avg_score=round(float(centrality.mean()), 4)
                 )
             
             return centrality
         except Exception as e:
             self.logger.error("Error computing centrality", error=str(e))
             # Fallback: use out-degree as a simple centrality measure
-            centrality = {}
-            total_nodes = self.graph.number_of_nodes()
-            if total_nodes > 0:
-                for node in self.graph.nodes():
-                    out_degree = self.graph.out_degree(node)
-                    centrality[node] = out_degree / total_nodes
-            return centrality
+            adjacency = self.builder.adjacency
+            return np.diff(adjacency.indptr) / max(adjacency.shape[0], 1)
     
-    def _compute_impact_scores(self) -> Dict[str, float]:
+    def _pagerank(self, alpha: float) -> np.ndarray:
+        """
+        PageRank by power iteration over a sparse transition matrix.
+        
+        Each iteration is a single CSR matrix-vector product; mass from
+        dangling nodes (no dependents) is redistributed uniformly, matching
+        nx.pagerank.
+        """
+        adjacency = self.builder.adjacency.astype(np.float64)
+        n = adjacency.shape[0]
+        if n == 0:
+            return np.zeros(0)
+        
+        out_degree = np.asarray(adjacency.sum(axis=1)).ravel()
+        is_dangling = out_degree == 0
+        
+        # Row-normalize, then transpose so each step is transition @ v
+        inv_degree = np.divide(1.0, out_degree, out=np.zeros(n), where=~is_dangling)
+        transition = (sp.diags_array(inv_degree) @ adjacency).T.tocsr()
+        
+        v = np.full(n, 1.0 / n)
+        teleport = (1.0 - alpha) / n
+        
+        for _ in range(PAGERANK_MAX_ITER):
+            last = v
+            dangling_mass = v[is_dangling].sum() / n
+            v = alpha * (transition @ v + dangling_mass) + teleport
+            if np.abs(v - last).sum() < n * PAGERANK_TOL:
+                return v
+        
+        raise nx.PowerIterationFailedConvergence(PAGERANK_MAX_ITER)
+    
+    def _compute_impact_scores(self) -> np.ndarray:
         """
         Compute impact score based on number of dependents.
         
         Impact score = (number of dependents) / (total nodes)
         Higher score means the node affects more downstream cells.
         """
-        total_nodes = self.graph.number_of_nodes()
-        if total_nodes == 0:
-            return {}
-        
-        impact_scores = {}
-        
-        for node_id in self.graph.nodes():
-            # descendants gives all nodes reachable from this node
-            dependents = nx.descendants(self.graph, node_id)
-            impact_score = len(dependents) / total_nodes
-            impact_scores[node_id] = impact_score
+        impact_scores = self.builder.compute_all_impact_scores()
         
         # Log statistics
-        if impact_scores:
-            max_impact = max(impact_scores.values())
-            nodes_with_impact = sum(1 for score in impact_scores.values() if score > 0)
+        if impact_scores.size:
             self.logger.debug(
                 "Computed impact scores",
-                node_count=len(impact_scores),
-                max_impact=round(max_impact, 4),
-                nodes_with_impact=nodes_with_impact
+                node_count=impact_scores.size,
+                max_impact=round(float(impact_scores.max()), 4),
+                nodes_with_impact=int(np.count_nonzero(impact_scores))
             )
         
         return impact_scores
-
     
     def _identify_clusters(self) -> None:
         """
@@ -198,42 +231,41 @@ class CostDriverAnalyzer:
         
         Uses weakly connected components to group related cells.
         """
-        # Convert to undirected for clustering
-        undirected = self.graph.to_undirected()
+        adjacency = self.builder.adjacency
+        if adjacency.shape[0] == 0:
+            self._cluster_labels = np.zeros(0, dtype=np.int32)
+            self._cluster_members = []
+            self.clusters = {}
+            return
         
-        # Find connected components
-        components = list(nx.connected_components(undirected))
+        _, self._cluster_labels = connected_components(adjacency, directed=True, connection='weak')
         
-        self.clusters = {}
-        for idx, component in enumerate(components):
-            self.clusters[idx] = list(component)
+        # Group node IDs by label
+        members = np.argsort(self._cluster_labels, kind='stable')
+        boundaries = np.flatnonzero(np.diff(self._cluster_labels[members])) + 1
+        self._cluster_members = np.split(members, boundaries)
+        
+        addrs = self.builder.addresses
+        self.clusters = {
+            idx: frozenset(addrs[i] for i in group.tolist())
+            for idx, group in enumerate(self._cluster_members)
+        }
         
         self.logger.debug("Identified clusters", cluster_count=len(self.clusters))
     
-    def _get_node_cluster(self, node_id: str) -> Optional[int]:
-        """Get cluster ID for a node."""
-        for cluster_id, nodes in self.clusters.items():
-            if node_id in nodes:
-                return cluster_id
-        return None
-    
-    def _generate_description(self, node_id: str, node_data: Dict[str, Any]) -> str:
+    def _generate_description(self, node: GraphNode, dependent_count: int) -> str:
         """Generate human-readable description of cost driver."""
-        dependent_count = len(list(nx.descendants(self.graph, node_id)))
-        
-        if node_data.get('is_input', False):
+        if node.is_input:
             return f"Input parameter affecting {dependent_count} cells"
-        elif node_data.get('has_formula', False):
+        elif node.has_formula:
             return f"Calculated value affecting {dependent_count} cells"
         else:
             return f"Value affecting {dependent_count} cells"
     
     def get_input_drivers(self) -> List[CostDriver]:
         """Get cost drivers that are input nodes (raw parameters)."""
-        return [
-            d for d in self.cost_drivers
-            if self.graph.nodes[d.cell_address].get('is_input', False)
-        ]
+        is_input = self.builder.get_node_masks()['is_input']
+        return [d for d, flag in zip(self.cost_drivers, is_input.tolist()) if flag]
     
     def get_drivers_by_sheet(self, sheet_name: str) -> List[CostDriver]:
         """Get cost drivers for a specific sheet."""
@@ -242,19 +274,18 @@ class CostDriverAnalyzer:
     def get_cluster_summary(self) -> Dict[int, Dict[str, Any]]:
         """Get summary of each cluster."""
         summary = {}
+        addrs = self.builder.addresses
+        sheet_names = self.builder.sheet_names
+        sheet_codes = self.builder.get_node_masks()['sheet_codes']
         
-        for cluster_id, nodes in self.clusters.items():
+        for cluster_id, members in enumerate(self._cluster_members):
             # Get sheets in this cluster
-            sheets = set()
-            for node_id in nodes:
-                sheet = self.graph.nodes[node_id].get('sheet', '')
-                if sheet:
-                    sheets.add(sheet)
+            sheets = [sheet_names[code] for code in np.unique(sheet_codes[members]).tolist()]
             
             summary[cluster_id] = {
-                "node_count": len(nodes),
-                "sheets": list(sheets),
-                "sample_nodes": nodes[:5]  # First 5 nodes as sample
+                "node_count": int(members.size),
+                "sheets": [sheet for sheet in sheets if sheet],
+                "sample_nodes": [addrs[i] for i in members[:5].tolist()]  # 5 nodes as sample
             }
         
         return summary
@@ -263,8 +294,12 @@ class CostDriverAnalyzer:
         """Export analysis results to dictionary format."""
         return {
             "total_drivers": len(self.cost_drivers),
-            "top_drivers": [d.to_dict() for d in self.cost_drivers[:20]],
-            "input_drivers": [d.to_dict() for d in self.get_input_drivers()[:10]],
+            "top_drivers": [
+                d.to_dict() for d in heapq.nlargest(20, self.cost_drivers, key=_driver_score)
+            ],
+            "input_drivers": [
+                d.to_dict() for d in heapq.nlargest(10, self.get_input_drivers(), key=_driver_score)
+            ],
             "cluster_count": len(self.clusters),
             "cluster_summary": self.get_cluster_summary()
         }
@@ -1,21 +1,241 @@
 """
 DAG Builder - Constructs Directed Acyclic Graph from formula dependencies.
 
-This module builds a NetworkX graph representing the dependency structure
-of an Excel workbook, with cells as nodes and formula references as edges.
+This module builds the dependency structure of an Excel workbook as a
+sparse graph over interned cell IDs, with cells as nodes and formula
+references as edges. A NetworkX view is built on demand.
 """
 
+import asyncio
+import multiprocessing
 import networkx as nx
-from typing import Dict, List, Set, Tuple, Optional, Any
+import orjson
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from typing import Dict, List, Set, Tuple, Optional, Any, BinaryIO, Iterable, Iterator
 from dataclasses import dataclass
-from collections import defaultdict
-from ..utils import get_logger
-from .parser import CellReference, FormulaParser
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import threading
+from ..utils import settings, get_logger
+from .parser import FormulaParser
 
 logger = get_logger(__name__)
 
+# Parser reused across batches within a worker process
+_worker_parser: Optional[FormulaParser] = None
 
-@dataclass
+# Bytes of reachability bitsets count_descendants holds at once
+REACH_MEMORY_LIMIT = 32 * 1024 * 1024
+
+# Process pool shared by all builders; started on first use
+_parse_executor: Optional[ProcessPoolExecutor] = None
+_parse_executor_lock = threading.Lock()
+
+
+def _get_parse_executor() -> ProcessPoolExecutor:
+    """
+    Get the shared formula parsing pool, starting it if needed.
+    
+    Workers are started from a forkserver (or spawned where that is not
+    available) rather than forked, since forking a process that already
+    runs threads can copy a held lock into the child and deadlock it.
+    """
+    global _parse_executor
+    with _parse_executor_lock:
+        if _parse_executor is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _parse_executor = ProcessPoolExecutor(
+                max_workers=settings.MAX_WORKERS,
+                mp_context=multiprocessing.get_context(method)
+            )
+        return _parse_executor
+
+
+def shutdown_parse_executor(wait: bool = True) -> None:
+    """Shut down the shared formula parsing pool, if it was started."""
+    global _parse_executor
+    with _parse_executor_lock:
+        executor, _parse_executor = _parse_executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def count_descendants(
+    adjacency: sp.csr_matrix,
+    memory_limit: int = REACH_MEMORY_LIMIT
+) -> np.ndarray:
+    """
+    Count the transitive dependents of every node in one batch pass.
+    
+    Reachable sets are propagated as bitsets over the condensation (DAG of
+    strongly connected components), successors first. Components are
+    numbered in depth-first postorder from the roots in cell order, so
+    nearby cells get nearby positions. The bitsets cover one chunk of
+    positions at a time, sized so that they fit in memory_limit bytes, and
+    each chunk only visits the ancestors of the cells it covers. Uses the
+    compiled kernel when Numba is available.
+    
+    Args:
+        adjacency: CSR adjacency; row u lists the dependents of node u
+        memory_limit: Bytes of bitsets held at once
+        
+    Returns:
+        int64 array of dependent counts (the node itself excluded), indexed
+        by node ID
+    """
+    n = adjacency.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    
+    n_components, labels = connected_components(adjacency, directed=True, connection='strong')
+    
+    # Condensation edges between distinct components
+    coo = adjacency.tocoo()
+    src = labels[coo.row]
+    tgt = labels[coo.col]
+    between = src != tgt
+    condensed = sp.csr_matrix(
+        (np.ones(int(between.sum()), dtype=np.int8), (src[between], tgt[between])),
+        shape=(n_components, n_components)
+    )
+    
+    # Imported on first use; loading Numba is slow
+    from .graph_kernels import NUMBA_AVAILABLE, postorder, reach_counts
+    
+    # Renumber components in postorder, so successors come first
+    first_node = np.full(n_components, n, dtype=np.int64)
+    np.minimum.at(first_node, labels, np.arange(n))
+    roots = np.argsort(first_node, kind='stable')
+    if NUMBA_AVAILABLE:
+        order = postorder(condensed.indptr, condensed.indices, roots)
+    else:
+        order = _postorder(condensed, roots)
+    rank = np.empty(n_components, dtype=np.intp)
+    rank[order] = np.arange(n_components)
+    condensed = condensed[order][:, order].tocsr()
+    predecessors = condensed.tocsc()
+    
+    sizes = np.bincount(labels, minlength=n_components)[order]
+    starts = np.zeros(n_components + 1, dtype=np.int64)
+    np.cumsum(sizes, out=starts[1:])
+    words = int(min(max(1, memory_limit // (8 * n_components)), -(-n // 64)))
+    
+    kernel = reach_counts if NUMBA_AVAILABLE else _reach_counts_py
+    counts = kernel(
+        condensed.indptr, condensed.indices,
+        predecessors.indptr, predecessors.indices,
+        starts, words
+    )
+    
+    return counts[rank[labels]] - 1
+
+
+def _postorder(adjacency: sp.csr_matrix, roots: np.ndarray) -> np.ndarray:
+    """Pure Python graph_kernels.postorder."""
+    indptr = adjacency.indptr.tolist()
+    indices = adjacency.indices.tolist()
+    visited = bytearray(adjacency.shape[0])
+    order = []
+    
+    for root in roots.tolist():
+        if visited[root]:
+            continue
+        visited[root] = 1
+        stack = [(root, indptr[root])]
+        while stack:
+            node, k = stack[-1]
+            if k < indptr[node + 1]:
+                stack[-1] = (node, k + 1)
+                successor = indices[k]
+                if not visited[successor]:
+                    visited[successor] = 1
+                    stack.append((successor, indptr[successor]))
+            else:
+                stack.pop()
+                order.append(node)
+    
+    return np.asarray(order, dtype=np.intp)
+
+
+def _reach_counts_py(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    pred_indptr: np.ndarray,
+    pred_indices: np.ndarray,
+    starts: np.ndarray,
+    words: int
+) -> np.ndarray:
+    """Pure Python graph_kernels.reach_counts, with int bitsets per chunk."""
+    n = len(starts) - 1
+    indptr = indptr.tolist()
+    indices = indices.tolist()
+    pred_indptr = pred_indptr.tolist()
+    pred_indices = pred_indices.tolist()
+    starts = starts.tolist()
+    total = starts[n]
+    chunk = 64 * words
+    counts = [0] * n
+    c_lo = 0
+    
+    for lo in range(0, total, chunk):
+        hi = lo + chunk
+        while starts[c_lo + 1] <= lo:
+            c_lo += 1
+        
+        # Only ancestors of the chunk's own components can reach into it
+        c_hi = c_lo
+        while c_hi < n and starts[c_hi] < hi:
+            c_hi += 1
+        masks = dict.fromkeys(range(c_lo, c_hi), 0)
+        queue = list(masks)
+        for c in queue:
+            for p in pred_indices[pred_indptr[c]:pred_indptr[c + 1]]:
+                if p not in masks:
+                    masks[p] = 0
+                    queue.append(p)
+        
+        for c in sorted(queue):
+            bits = 0
+            own_lo = max(starts[c], lo)
+            own_hi = min(starts[c + 1], hi)
+            if own_lo < own_hi:
+                bits = ((1 << (own_hi - own_lo)) - 1) << (own_lo - lo)
+            for s in indices[indptr[c]:indptr[c + 1]]:
+                if s in masks:
+                    bits |= masks[s]
+            masks[c] = bits
+            counts[c] += bits.bit_count()
+    
+    return np.asarray(counts, dtype=np.int64)
+
+
+def _parse_formula_batch(
+    sheet: str,
+    formulas: List[str]
+) -> List[Tuple[List[Tuple[Optional[str], str, int]], bool]]:
+    """
+    Parse a batch of formulas from one sheet in a worker process.
+    
+    Returns plain tuples so results pickle cheaply: for each formula, its
+    dependencies as (sheet, col, row) and whether it is dynamic.
+    """
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = FormulaParser()
+    
+    results = []
+    for formula in formulas:
+        parsed = _worker_parser.parse(formula, current_sheet=sheet)
+        dependencies = [(dep.sheet, dep.col, dep.row) for dep in parsed['dependencies']]
+        results.append((dependencies, parsed['is_dynamic']))
+    return results
+
+
+@dataclass(slots=True)
 class GraphNode:
     """Represents a node in the dependency graph."""
     address: str  # Full address like "Sheet1!A1"
@@ -35,13 +255,13 @@ class GraphNode:
         return self.address == other.address
 
 
-@dataclass
+@dataclass(slots=True)
 class GraphEdge:
     """Represents an edge in the dependency graph."""
     source: str  # Cell being referenced
     target: str  # Cell containing the formula
     edge_type: str  # 'static' or 'dynamic'
-    formula_snippet: Optional[str] = None
+    formula_snippet: Optional[str] = None  # First 50 characters of the target's formula
 
 
 class DAGBuilder:
@@ -51,75 +271,169 @@ class DAGBuilder:
     The graph represents:
     - Nodes: Individual cells
     - Edges: Dependencies (A→B means B depends on A)
+    
+    Cells are interned to dense int IDs and kept as per-node columns plus a
+    CSR/CSC adjacency; addresses are only looked up at the API boundary.
     """
     
+    # Sheets with more formulas than this are parsed in worker processes
+    PARALLEL_PARSE_THRESHOLD = 5000
+    PARSE_BATCH_SIZE = 5000
+    
     def __init__(self):
-        self.graph = nx.DiGraph()
         self.parser = FormulaParser()
         self.logger = logger.bind(component="DAGBuilder")
-        self.nodes: Dict[str, GraphNode] = {}
-        self.edges: List[GraphEdge] = []
+        # Addresses interned to dense int IDs
+        self._id_of: Dict[str, int] = {}
+        self._addrs: List[str] = []
+        # Per-node columns, indexed by node ID
+        self._sheet_codes: Dict[str, int] = {}
+        self._sheet_names: List[str] = []
+        self._node_sheets = array('i')
+        self._cols: List[str] = []
+        self._rows = array('i')
+        self._values: List[Any] = []
+        self._formulas: List[Optional[str]] = []
+        # Whether the node's formula is dynamic; its incoming edges take the type
+        self._is_dynamic = bytearray()
+        # Edges as parallel ID arrays until the adjacency is built
+        self._src_ids = array('i')
+        self._tgt_ids = array('i')
+        # Sparse adjacency over node IDs used by the traversal queries
+        self._csr: sp.csr_matrix = sp.csr_matrix((0, 0), dtype=np.int8)
+        self._csc: sp.csc_matrix = sp.csc_matrix((0, 0), dtype=np.int8)
+        self._is_input: np.ndarray = np.zeros(0, dtype=bool)
+        self._is_output: np.ndarray = np.zeros(0, dtype=bool)
+        self._cycles: List[np.ndarray] = []
+        # Filled in on first use
+        self._dependent_counts: Optional[np.ndarray] = None
+        self._graph: Optional[nx.DiGraph] = None
     
-    def build_graph(
+    def build(
         self,
         sheets_data: List[Dict[str, Any]],
         include_values: bool = False
-    ) -> nx.DiGraph:
+    ) -> None:
         """
-        Build dependency graph from sheets data.
+        Build the dependency graph from sheets data.
         
         Args:
-            sheets_data: List of sheet dictionaries with cells
+            sheets_data: List of columnar sheet dictionaries
             include_values: Whether to include cell values in nodes
-            
+        """
+        large_sheets = self._build_nodes(sheets_data, include_values)
+        if large_sheets:
+            self._process_formulas_parallel(large_sheets)
+        self._finish_build()
+    
+    async def build_async(
+        self,
+        sheets_data: List[Dict[str, Any]],
+        include_values: bool = False
+    ) -> None:
+        """
+        Build the dependency graph without blocking the event loop.
+        
+        The passes over the cells run in a worker thread, and the parse
+        batches of large sheets are awaited from the process pool.
+        
+        Args:
+            sheets_data: List of columnar sheet dictionaries
+            include_values: Whether to include cell values in nodes
+        """
+        large_sheets = await asyncio.to_thread(self._build_nodes, sheets_data, include_values)
+        if large_sheets:
+            await self._process_formulas_parallel_async(large_sheets)
+        await asyncio.to_thread(self._finish_build)
+    
+    def _build_nodes(
+        self,
+        sheets_data: List[Dict[str, Any]],
+        include_values: bool
+    ) -> List[Tuple[str, List[Tuple[int, str]]]]:
+        """
+        Create all nodes and the edges of the formulas parsed in process.
+        
         Returns:
-            NetworkX DiGraph with dependency structure
+            The (sheet name, formula cells) of sheets left for the process pool
         """
         self.logger.info("Starting graph construction", sheet_count=len(sheets_data))
         
-        # First pass: Create all nodes
+        # First pass: Create all nodes and collect the formula cells per sheet
+        sheet_formulas = []
         for sheet_data in sheets_data:
             sheet_name = sheet_data['name']
-            cells = sheet_data['cells']
+            formula_cells = []
             
-            for cell in cells:
-                self._add_node(
+            # Sheets are columnar; rows are converted back to Python ints
+            # so node attributes stay JSON-serializable
+            for row, col, value, formula in zip(
+                sheet_data['rows'].tolist(),
+                sheet_data['cols'],
+                sheet_data['values'],
+                sheet_data['formulas'],
+            ):
+                node_id = self._add_node(
                     sheet=sheet_name,
-                    col=cell.get('col', ''),
-                    row=cell.get('row', 0),
-                    value=cell.get('value') if include_values else None,
-                    formula=cell.get('formula')
+                    col=col,
+                    row=row,
+                    value=value if include_values else None,
+                    formula=formula
                 )
+                if formula:
+                    formula_cells.append((node_id, formula))
+            
+            sheet_formulas.append((sheet_name, formula_cells))
         
         # Second pass: Create edges from formulas
-        for sheet_data in sheets_data:
-            sheet_name = sheet_data['name']
-            cells = sheet_data['cells']
+        large_sheets = []
+        for sheet_name, formula_cells in sheet_formulas:
+            if len(formula_cells) > self.PARALLEL_PARSE_THRESHOLD and settings.ENABLE_MULTIPROCESSING:
+                large_sheets.append((sheet_name, formula_cells))
+                continue
             
-            for cell in cells:
-                if cell.get('formula'):
-                    self._process_formula(
-                        sheet=sheet_name,
-                        col=cell.get('col', ''),
-                        row=cell.get('row', 0),
-                        formula=cell['formula']
-                    )
+            for node_id, formula in formula_cells:
+                self._process_formula(sheet=sheet_name, node_id=node_id, formula=formula)
+        
+        return large_sheets
+    
+    def _finish_build(self) -> None:
+        """Build the adjacency and derive the I/O nodes and cycles from it."""
+        self._build_adjacency()
+        self._dependent_counts = None
+        self._graph = None
         
         # Mark input and output nodes
         self._identify_io_nodes()
         
-        # Detect cycles
-        cycles = self._detect_cycles()
-        if cycles:
-            self.logger.warning("Circular references detected", cycle_count=len(cycles))
+        # Detect cycles (one entry per circular component)
+        self._cycles = self._detect_cycles()
+        if self._cycles:
+            self.logger.warning("Circular references detected", cycle_count=len(self._cycles))
         
         self.logger.info(
             "Graph construction complete",
-            node_count=self.graph.number_of_nodes(),
-            edge_count=self.graph.number_of_edges(),
-            cycle_count=len(cycles)
+            node_count=len(self._addrs),
+            edge_count=self._csr.nnz,
+            cycle_count=len(self._cycles)
         )
+    
+    def build_graph(
+        self,
+        sheets_data: List[Dict[str, Any]],
+        include_values: bool = False
+    ) -> nx.DiGraph:
+        """
+        Build dependency graph from sheets data.
         
+        Args:
+            sheets_data: List of columnar sheet dictionaries
+            include_values: Whether to include cell values in nodes
+            
+        Returns:
+            NetworkX DiGraph with dependency structure
+        """
+        self.build(sheets_data, include_values)
         return self.graph
     
     def _add_node(
@@ -129,115 +443,368 @@ class DAGBuilder:
         row: int,
         value: Any,
         formula: Optional[str]
-    ) -> str:
-        """Add a node to the graph."""
+    ) -> int:
+        """Add a node to the graph and return its ID."""
         address = f"{sheet}!{col}{row}"
+        node_id = self._id_of.get(address)
+        if node_id is not None:
+            # A repeated cell keeps the last contents it was given
+            self._values[node_id] = value
+            self._formulas[node_id] = formula
+            return node_id
         
-        node = GraphNode(
-            address=address,
-            sheet=sheet,
-            col=col,
-            row=row,
-            value=value,
-            formula=formula,
-            has_formula=formula is not None,
-            is_input=False,  # Will be determined later
-            is_output=False
-        )
+        node_id = self._intern(address)
         
-        self.nodes[address] = node
+        sheet_code = self._sheet_codes.get(sheet)
+        if sheet_code is None:
+            sheet_code = self._sheet_codes[sheet] = len(self._sheet_names)
+            self._sheet_names.append(sheet)
         
-        # Add to NetworkX graph
-        self.graph.add_node(
-            address,
-            sheet=sheet,
-            col=col,
-            row=row,
-            has_formula=formula is not None,
-            formula=formula
-        )
+        self._node_sheets.append(sheet_code)
+        self._cols.append(col)
+        self._rows.append(row)
+        self._values.append(value)
+        self._formulas.append(formula)
+        self._is_dynamic.append(0)
         
-        return address
+        return node_id
     
     def _process_formula(
         self,
         sheet: str,
-        col: str,
-        row: int,
+        node_id: int,
         formula: str
     ) -> None:
         """Process a formula and create edges for its dependencies."""
-        target_address = f"{sheet}!{col}{row}"
-        
         # Parse formula to get dependencies
         parsed = self.parser.parse(formula, current_sheet=sheet)
-        dependencies = parsed['dependencies']
-        is_dynamic = parsed['is_dynamic']
+        dependencies = ((dep.sheet, dep.col, dep.row) for dep in parsed['dependencies'])
         
-        # Create edges for each dependency
-        for dep in dependencies:
-            source_address = dep.to_address()
-            
-            # Ensure source node exists (it might be a reference to another sheet)
-            if source_address not in self.nodes:
+        self._add_formula_edges(sheet, node_id, dependencies, parsed['is_dynamic'])
+    
+    def _process_formulas_parallel(
+        self,
+        large_sheets: List[Tuple[str, List[Tuple[int, str]]]]
+    ) -> None:
+        """
+        Parse the formulas of large sheets in the shared process pool.
+        
+        Falls back to parsing in this process if the pool cannot run; a
+        broken pool is discarded so the next build starts a fresh one.
+        """
+        batches = self._parse_batches(large_sheets)
+        
+        try:
+            results = list(_get_parse_executor().map(
+                _parse_formula_batch,
+                [sheet_name for sheet_name, _ in batches],
+                [[formula for _, formula in cells] for _, cells in batches]
+            ))
+        except (OSError, BrokenProcessPool) as e:
+            self._parallel_parse_failed(e)
+            self._process_formulas_serial(large_sheets)
+            return
+        
+        self._add_batch_edges(batches, results)
+    
+    async def _process_formulas_parallel_async(
+        self,
+        large_sheets: List[Tuple[str, List[Tuple[int, str]]]]
+    ) -> None:
+        """Parse the formulas of large sheets in the process pool, awaiting each batch."""
+        batches = self._parse_batches(large_sheets)
+        loop = asyncio.get_running_loop()
+        
+        try:
+            executor = _get_parse_executor()
+            results = await asyncio.gather(*(
+                loop.run_in_executor(
+                    executor, _parse_formula_batch, sheet_name, [formula for _, formula in cells]
+                )
+                for sheet_name, cells in batches
+            ))
+        except (OSError, BrokenProcessPool) as e:
+            self._parallel_parse_failed(e)
+            await asyncio.to_thread(self._process_formulas_serial, large_sheets)
+            return
+        
+        await asyncio.to_thread(self._add_batch_edges, batches, results)
+    
+    def _parse_batches(
+        self,
+        large_sheets: List[Tuple[str, List[Tuple[int, str]]]]
+    ) -> List[Tuple[str, List[Tuple[int, str]]]]:
+        """
+        Split large sheets into batches of PARSE_BATCH_SIZE formula cells.
+        
+        Only formula strings and dependency tuples cross the process boundary.
+        """
+        batches = []
+        for sheet_name, formula_cells in large_sheets:
+            for start in range(0, len(formula_cells), self.PARSE_BATCH_SIZE):
+                batches.append((sheet_name, formula_cells[start:start + self.PARSE_BATCH_SIZE]))
+        
+        self.logger.info("Parsing formulas in parallel", sheet_count=len(large_sheets), batch_count=len(batches))
+        
+        return batches
+    
+    def _add_batch_edges(
+        self,
+        batches: List[Tuple[str, List[Tuple[int, str]]]],
+        results: List[List[Tuple[List[Tuple[Optional[str], str, int]], bool]]]
+    ) -> None:
+        """Create the edges of parsed batches, in batch order."""
+        for (sheet_name, cells), parsed_batch in zip(batches, results):
+            for (node_id, _), (dependencies, is_dynamic) in zip(cells, parsed_batch):
+                self._add_formula_edges(sheet_name, node_id, dependencies, is_dynamic)
+    
+    def _parallel_parse_failed(self, error: Exception) -> None:
+        """Log a pool failure, discarding the pool if it is broken."""
+        self.logger.warning("Parallel parsing unavailable, parsing serially", error=str(error))
+        if isinstance(error, BrokenProcessPool):
+            shutdown_parse_executor(wait=False)
+    
+    def _process_formulas_serial(
+        self,
+        large_sheets: List[Tuple[str, List[Tuple[int, str]]]]
+    ) -> None:
+        """Parse the formulas of large sheets in this process."""
+        for sheet_name, formula_cells in large_sheets:
+            for node_id, formula in formula_cells:
+                self._process_formula(sheet=sheet_name, node_id=node_id, formula=formula)
+    
+    def _add_formula_edges(
+        self,
+        sheet: str,
+        target_id: int,
+        dependencies: Iterable[Tuple[Optional[str], str, int]],
+        is_dynamic: bool
+    ) -> None:
+        """
+        Create edges from (sheet, col, row) dependencies to a formula cell.
+        
+        References resolve to the cell's own address, so $A$1 and A1 are
+        the same node.
+        """
+        if is_dynamic:
+            self._is_dynamic[target_id] = 1
+        
+        for dep_sheet, dep_col, dep_row in dependencies:
+            dep_sheet = dep_sheet or sheet
+            source_id = self._id_of.get(f"{dep_sheet}!{dep_col}{dep_row}")
+            if source_id is None:
                 # Create placeholder node for external reference
-                self._add_node(
-                    sheet=dep.sheet or sheet,
-                    col=dep.col,
-                    row=dep.row,
+                source_id = self._add_node(
+                    sheet=dep_sheet,
+                    col=dep_col,
+                    row=dep_row,
                     value=None,
                     formula=None
                 )
             
-            # Add edge
-            edge_type = 'dynamic' if is_dynamic else 'static'
-            self._add_edge(source_address, target_address, edge_type, formula)
+            self._src_ids.append(source_id)
+            self._tgt_ids.append(target_id)
     
-    def _add_edge(
-        self,
-        source: str,
-        target: str,
-        edge_type: str,
-        formula: Optional[str] = None
-    ) -> None:
-        """Add an edge to the graph."""
-        edge = GraphEdge(
-            source=source,
-            target=target,
-            edge_type=edge_type,
-            formula_snippet=formula[:50] if formula else None
-        )
+    def _intern(self, address: str) -> int:
+        """Return the dense int ID of an address, assigning the next free one."""
+        nid = self._id_of.get(address)
+        if nid is None:
+            nid = self._id_of[address] = len(self._addrs)
+            self._addrs.append(address)
+        return nid
+    
+    def _build_adjacency(self) -> None:
+        """
+        Build CSR/CSC adjacency matrices from the interned edge arrays.
+        
+        Row u of the CSR lists the dependents of node u; column v of the CSC
+        lists the dependencies of node v. Repeated edges collapse into one.
+        The edge arrays are released once the matrices are built.
+        """
+        n = len(self._addrs)
+        src = np.frombuffer(self._src_ids, dtype=np.int32)
+        tgt = np.frombuffer(self._tgt_ids, dtype=np.int32)
+        data = np.ones(len(src), dtype=np.int8)
         
-        self.edges.append(edge)
+        self._csr = sp.csr_matrix((data, (src, tgt)), shape=(n, n))
+        self._csr.sum_duplicates()
+        self._csr.data[:] = 1
+        self._csc = self._csr.tocsc()
         
-        self.graph.add_edge(
-            source,
-            target,
-            type=edge_type,
-            formula=formula
-        )
+        self._src_ids = array('i')
+        self._tgt_ids = array('i')
+    
+    def _reachable(self, adjacency: sp.spmatrix, seeds: List[int]) -> np.ndarray:
+        """
+        Boolean mask of nodes reachable from seeds (seeds included).
+        
+        Pass the CSR (rows are successors) for dependents or the CSC
+        (columns are predecessors) for dependencies. Uses the compiled
+        kernel when Numba is available; otherwise a level-synchronous BFS
+        gathers each frontier's neighbours with one sparse slice.
+        """
+        # Imported on first use; loading Numba is slow
+        from .graph_kernels import NUMBA_AVAILABLE, bfs_reachable
+        
+        if NUMBA_AVAILABLE:
+            return bfs_reachable(
+                adjacency.indptr, adjacency.indices,
+                np.asarray(seeds, dtype=np.int32), len(self._addrs)
+            )
+        
+        visited = np.zeros(len(self._addrs), dtype=bool)
+        frontier = np.asarray(seeds, dtype=np.int32)
+        visited[frontier] = True
+        
+        by_column = sp.isspmatrix_csc(adjacency)
+        
+        while frontier.size:
+            if by_column:
+                neighbours = adjacency[:, frontier].indices
+            else:
+                neighbours = adjacency[frontier].indices
+            neighbours = np.unique(neighbours[~visited[neighbours]])
+            visited[neighbours] = True
+            frontier = neighbours
+        
+        return visited
     
     def _identify_io_nodes(self) -> None:
-        """Identify input (no predecessors) and output (no successors) nodes."""
-        for node_id in self.graph.nodes():
-            in_degree = self.graph.in_degree(node_id)
-            out_degree = self.graph.out_degree(node_id)
-            
-            if node_id in self.nodes:
-                self.nodes[node_id].is_input = (in_degree == 0)
-                self.nodes[node_id].is_output = (out_degree == 0)
-                
-                # Update graph node attributes
-                self.graph.nodes[node_id]['is_input'] = (in_degree == 0)
-                self.graph.nodes[node_id]['is_output'] = (out_degree == 0)
-    
-    def _detect_cycles(self) -> List[List[str]]:
-        """Detect circular references in the graph."""
-        try:
-            cycles = list(nx.simple_cycles(self.graph))
-            return cycles
-        except:
+        """
+        Identify input (no predecessors) and output (no successors) nodes.
+        
+        Degrees come from the CSC/CSR index pointers.
+        """
+        self._is_input = np.diff(self._csc.indptr) == 0
+        self._is_output = np.diff(self._csr.indptr) == 0
+    
+    def _detect_cycles(self) -> List[np.ndarray]:
+        """
+        Detect circular references in the graph.
+        
+        Returns one node ID array per strongly connected component that
+        contains a cycle: components with more than one cell, plus cells
+        that reference themselves.
+        """
+        if not self._addrs:
             return []
+        
+        n_components, labels = connected_components(
+            self._csr, directed=True, connection='strong'
+        )
+        sizes = np.bincount(labels, minlength=n_components)
+        
+        in_cycle = sizes[labels] > 1
+        self_loops = np.flatnonzero((self._csr.diagonal() != 0) & ~in_cycle)
+        
+        # Group the members of multi-cell components by label
+        members = np.flatnonzero(in_cycle)
+        members = members[np.argsort(labels[members], kind='stable')]
+        boundaries = np.flatnonzero(np.diff(labels[members])) + 1
+        
+        cycles = [group for group in np.split(members, boundaries) if group.size]
+        cycles.extend(self_loops[:, None])
+        return cycles
+    
+    @property
+    def addresses(self) -> List[str]:
+        """Cell addresses indexed by node ID."""
+        return self._addrs
+    
+    @property
+    def adjacency(self) -> sp.csr_matrix:
+        """CSR adjacency over node IDs; row u lists the dependents of node u."""
+        return self._csr
+    
+    @property
+    def sheet_names(self) -> List[str]:
+        """Sheet names indexed by the codes in get_node_masks()['sheet_codes']."""
+        return self._sheet_names
+    
+    def node_id(self, cell_address: str) -> Optional[int]:
+        """ID of a cell address, or None if it is not in the graph."""
+        return self._id_of.get(cell_address)
+    
+    def get_node(self, node_id: int) -> GraphNode:
+        """Node record of a node ID."""
+        formula = self._formulas[node_id]
+        return GraphNode(
+            address=self._addrs[node_id],
+            sheet=self._sheet_names[self._node_sheets[node_id]],
+            col=self._cols[node_id],
+            row=self._rows[node_id],
+            value=self._values[node_id],
+            formula=formula,
+            has_formula=formula is not None,
+            is_input=bool(self._is_input[node_id]),
+            is_output=bool(self._is_output[node_id])
+        )
+    
+    @property
+    def nodes(self) -> Dict[str, GraphNode]:
+        """Node records keyed by address, built on demand from the columns."""
+        return {address: self.get_node(nid) for nid, address in enumerate(self._addrs)}
+    
+    @property
+    def edges(self) -> List[GraphEdge]:
+        """Graph edges as GraphEdge records, built on demand from the CSR."""
+        addrs = self._addrs
+        formulas = self._formulas
+        coo = self._csr.tocoo()
+        return [
+            GraphEdge(
+                source=addrs[source],
+                target=addrs[target],
+                edge_type='dynamic' if self._is_dynamic[target] else 'static',
+                formula_snippet=formulas[target][:50] if formulas[target] else None
+            )
+            for source, target in zip(coo.row.tolist(), coo.col.tolist())
+        ]
+    
+    @property
+    def graph(self) -> nx.DiGraph:
+        """NetworkX view of the whole graph keyed by address, built on first access."""
+        if self._graph is None:
+            self._graph = self._to_networkx()
+        return self._graph
+    
+    def get_cycles(self) -> List[np.ndarray]:
+        """Node IDs of each strongly connected component containing a cycle."""
+        return self._cycles
+    
+    def _to_networkx(self, ids: Optional[np.ndarray] = None) -> nx.DiGraph:
+        """Materialize the nodes in ids (all nodes by default) as a NetworkX graph."""
+        adjacency = self._csr
+        if ids is None:
+            ids = np.arange(len(self._addrs))
+        else:
+            adjacency = adjacency[ids][:, ids]
+        
+        addrs = self._addrs
+        is_input = self._is_input.tolist()
+        is_output = self._is_output.tolist()
+        graph = nx.DiGraph()
+        
+        graph.add_nodes_from(
+            (addrs[nid], {
+                'sheet': self._sheet_names[self._node_sheets[nid]],
+                'col': self._cols[nid],
+                'row': self._rows[nid],
+                'has_formula': self._formulas[nid] is not None,
+                'formula': self._formulas[nid],
+                'is_input': is_input[nid],
+                'is_output': is_output[nid],
+            })
+            for nid in ids.tolist()
+        )
+        
+        coo = adjacency.tocoo()
+        graph.add_edges_from(
+            (addrs[source], addrs[target], {'type': 'dynamic' if self._is_dynamic[target] else 'static'})
+            for source, target in zip(ids[coo.row].tolist(), ids[coo.col].tolist())
+        )
+        
+        return graph
     
     def get_dependencies(self, cell_address: str, recursive: bool = False) -> Set[str]:
         """
@@ -250,15 +817,15 @@ class DAGBuilder:
         Returns:
             Set of cell addresses that this cell depends on
         """
-        if cell_address not in self.graph:
+        if cell_address not in self._id_of:
             return set()
         
         if recursive:
             # Get all ancestors (transitive dependencies)
-            return set(nx.ancestors(self.graph, cell_address))
+            return self._reachable_addresses(self._csc, cell_address)
         else:
             # Get direct predecessors only
-            return set(self.graph.predecessors(cell_address))
+            return self._neighbour_addresses(self._csc, cell_address)
     
     def get_dependents(self, cell_address: str, recursive: bool = False) -> Set[str]:
         """
@@ -271,28 +838,80 @@ class DAGBuilder:
         Returns:
             Set of cell addresses that depend on this cell
         """
-        if cell_address not in self.graph:
+        if cell_address not in self._id_of:
             return set()
         
         if recursive:
             # Get all descendants (transitive dependents)
-            return set(nx.descendants(self.graph, cell_address))
+            return self._reachable_addresses(self._csr, cell_address)
         else:
             # Get direct successors only
-            return set(self.graph.successors(cell_address))
+            return self._neighbour_addresses(self._csr, cell_address)
+    
+    def _neighbour_addresses(self, adjacency: sp.spmatrix, cell_address: str) -> Set[str]:
+        """Addresses in the CSR row / CSC column of cell_address."""
+        nid = self._id_of[cell_address]
+        neighbours = adjacency.indices[adjacency.indptr[nid]:adjacency.indptr[nid + 1]]
+        return {self._addrs[i] for i in neighbours}
+    
+    def _reachable_addresses(self, adjacency: sp.spmatrix, cell_address: str) -> Set[str]:
+        """Addresses reachable from cell_address, excluding the cell itself."""
+        seed = self._id_of[cell_address]
+        visited = self._reachable(adjacency, [seed])
+        visited[seed] = False
+        return {self._addrs[i] for i in np.flatnonzero(visited)}
     
     def get_calculation_order(self) -> List[str]:
         """
         Get topological sort order for calculation.
         
+        Uses Kahn's algorithm over the CSR adjacency.
+        
         Returns:
             List of cell addresses in calculation order
         """
-        try:
-            return list(nx.topological_sort(self.graph))
-        except nx.NetworkXError:
+        n = len(self._addrs)
+        order = self._topological_ids(self._csr)
+        
+        if len(order) != n:
             self.logger.error("Cannot compute topological sort - graph has cycles")
             return []
+        
+        return [self._addrs[i] for i in order]
+    
+    @staticmethod
+    def _topological_ids(adjacency: sp.csr_matrix) -> List[int]:
+        """
+        Kahn's algorithm over a CSR adjacency.
+        
+        Returns node IDs in topological order; the list is shorter than the
+        node count if the graph has cycles.
+        """
+        n = adjacency.shape[0]
+        indegree = np.bincount(adjacency.indices, minlength=n)
+        
+        from .graph_kernels import NUMBA_AVAILABLE, topological_order
+        
+        if NUMBA_AVAILABLE:
+            return topological_order(adjacency.indptr, adjacency.indices, indegree, n).tolist()
+        
+        indptr = adjacency.indptr.tolist()
+        indices = adjacency.indices.tolist()
+        
+        # Seed with the roots found in one vectorized pass
+        queue = deque(np.flatnonzero(indegree == 0).tolist())
+        indegree = indegree.tolist()
+        order = []
+        
+        while queue:
+            u = queue.popleft()
+            order.append(u)
+            for v in indices[indptr[u]:indptr[u + 1]]:
+                indegree[v] -= 1
+                if indegree[v] == 0:
+                    queue.append(v)
+        
+        return order
     
     def get_subgraph(self, cell_addresses: List[str], include_dependencies: bool = True) -> nx.DiGraph:
         """
@@ -306,15 +925,13 @@ class DAGBuilder:
             Subgraph containing specified cells
         """
         if include_dependencies:
-            # Include all ancestors of specified cells
-            nodes_to_include = set(cell_addresses)
-            for addr in cell_addresses:
-                if addr in self.graph:
-                    nodes_to_include.update(nx.ancestors(self.graph, addr))
-            
-            return self.graph.subgraph(nodes_to_include).copy()
+            # Include all ancestors of specified cells in one multi-source BFS
+            seeds = [self._id_of[addr] for addr in cell_addresses if addr in self._id_of]
+            ids = np.flatnonzero(self._reachable(self._csc, seeds))
         else:
-            return self.graph.subgraph(cell_addresses).copy()
+            ids = np.unique([self._id_of[addr] for addr in cell_addresses if addr in self._id_of])
+        
+        return self._to_networkx(ids.astype(np.intp))
     
     def compute_impact_score(self, cell_address: str) -> float:
         """
@@ -328,17 +945,35 @@ class DAGBuilder:
         Returns:
             Impact score (0-1)
         """
-        if cell_address not in self.graph:
+        if cell_address not in self._id_of:
             return 0.0
         
-        # Count all transitive dependents
-        dependents = self.get_dependents(cell_address, recursive=True)
-        total_nodes = self.graph.number_of_nodes()
+        counts = self.compute_dependent_counts()
+        return float(counts[self._id_of[cell_address]]) / len(self._addrs)
+    
+    def compute_all_impact_scores(self) -> np.ndarray:
+        """
+        Compute the impact score of every node in one pass.
         
-        if total_nodes == 0:
-            return 0.0
+        Returns:
+            Array of impact scores (0-1) indexed by node ID
+        """
+        counts = self.compute_dependent_counts()
+        return counts / max(len(self._addrs), 1)
+    
+    def compute_dependent_counts(self) -> np.ndarray:
+        """
+        Count the transitive dependents of every node.
         
-        return len(dependents) / total_nodes
+        Computed once by count_descendants, within REACH_MEMORY_LIMIT, and
+        cached until the graph is rebuilt.
+        
+        Returns:
+            int64 array of dependent counts indexed by node ID
+        """
+        if self._dependent_counts is None:
+            self._dependent_counts = count_descendants(self._csr)
+        return self._dependent_counts
     
     def get_graph_metrics(self) -> Dict[str, Any]:
         """
@@ -347,28 +982,105 @@ class DAGBuilder:
         Returns:
             Dictionary of metrics
         """
+        n = len(self._addrs)
+        m = self._csr.nnz
+        
         metrics = {
-            "node_count": self.graph.number_of_nodes(),
-            "edge_count": self.graph.number_of_edges(),
-            "density": nx.density(self.graph),
-            "is_dag": nx.is_directed_acyclic_graph(self.graph),
+            "node_count": n,
+            "edge_count": m,
+            "density": m / (n * (n - 1)) if n > 1 else 0,
+            "is_dag": len(self._topological_ids(self._csr)) == n,
         }
         
         # Count input/output nodes
-        input_count = sum(1 for n in self.nodes.values() if n.is_input)
-        output_count = sum(1 for n in self.nodes.values() if n.is_output)
+        metrics["input_nodes"] = int(self._is_input.sum())
+        metrics["output_nodes"] = int(self._is_output.sum())
+        
+        # Average degree (in + out, so each edge counts twice)
+        metrics["avg_degree"] = 2 * m / n if n > 0 else 0
+        
+        return metrics
+    
+    def get_node_masks(self) -> Dict[str, np.ndarray]:
+        """
+        Per-node columns aligned with the exported node order.
+        
+        Whole-graph counts can be taken with NumPy instead of walking node
+        records.
+        
+        Returns:
+            Dictionary with boolean 'has_formula', 'is_input' and 'is_output'
+            masks and int32 'sheet_codes' (small ints assigned per sheet at
+            build time)
+        """
+        return {
+            "has_formula": np.fromiter(
+                (formula is not None for formula in self._formulas),
+                dtype=bool, count=len(self._formulas)
+            ),
+            "is_input": self._is_input,
+            "is_output": self._is_output,
+            "sheet_codes": np.frombuffer(self._node_sheets, dtype=np.int32),
+        }
+    
+    def get_node_counts(self) -> Dict[str, int]:
+        """
+        Count formula nodes, input nodes and sheets of the exported nodes.
+        
+        Uses the fused compiled kernel when Numba is available; otherwise
+        the masks are reduced with NumPy.
         
-        metrics["input_nodes"] = input_count
-        metrics["output_nodes"] = output_count
+        Returns:
+            Dictionary with formula_count, input_count and sheet_count
+        """
+        # Imported on first use; loading Numba is slow
+        from .graph_kernels import NUMBA_AVAILABLE, node_counts
         
-        # Average degree
-        if self.graph.number_of_nodes() > 0:
-            degrees = [d for n, d in self.graph.degree()]
-            metrics["avg_degree"] = sum(degrees) / len(degrees)
+        masks = self.get_node_masks()
+        
+        if NUMBA_AVAILABLE:
+            formula_count, input_count, sheet_count = node_counts(
+                masks["has_formula"], masks["is_input"],
+                masks["sheet_codes"], len(self._sheet_codes)
+            )
         else:
-            metrics["avg_degree"] = 0
+            formula_count = masks["has_formula"].sum()
+            input_count = masks["is_input"].sum()
+            sheet_count = np.unique(masks["sheet_codes"]).size
         
-        return metrics
+        return {
+            "formula_count": int(formula_count),
+            "input_count": int(input_count),
+            "sheet_count": int(sheet_count),
+        }
+    
+    def _node_records(self) -> Iterator[Dict[str, Any]]:
+        """Yield the serializable record of each node."""
+        sheet_names = self._sheet_names
+        is_input = self._is_input.tolist()
+        is_output = self._is_output.tolist()
+        for nid, address in enumerate(self._addrs):
+            formula = self._formulas[nid]
+            yield {
+                "id": address,
+                "sheet": sheet_names[self._node_sheets[nid]],
+                "col": self._cols[nid],
+                "row": self._rows[nid],
+                "has_formula": formula is not None,
+                "formula": formula,
+                "value": self._values[nid],
+                "is_input": is_input[nid],
+                "is_output": is_output[nid],
+            }
+    
+    def _edge_records(self) -> Iterator[Dict[str, Any]]:
+        """Yield the serializable record of each edge."""
+        for edge in self.edges:
+            yield {
+                "source": edge.source,
+                "target": edge.target,
+                "type": edge.edge_type,
+            }
     
     def export_to_dict(self) -> Dict[str, Any]:
         """
@@ -378,27 +1090,34 @@ class DAGBuilder:
             Dictionary representation of graph
         """
         return {
-            "nodes": [
-                {
-                    "id": node.address,
-                    "sheet": node.sheet,
-                    "col": node.col,
-                    "row": node.row,
-                    "has_formula": node.has_formula,
-                    "formula": node.formula,
-                    "value": node.value,
-                    "is_input": node.is_input,
-                    "is_output": node.is_output,
-                }
-                for node in self.nodes.values()
-            ],
-            "edges": [
-                {
-                    "source": edge.source,
-                    "target": edge.target,
-                    "type": edge.edge_type,
-                }
-                for edge in self.edges
-            ],
+            "nodes": list(self._node_records()),
+            "edges": list(self._edge_records()),
             "metrics": self.get_graph_metrics()
         }
+    
+    def export_to_json(self, fp: BinaryIO) -> None:
+        """
+        Stream the export_to_dict document as JSON to a binary file object.
+        
+        Records are encoded one at a time with orjson, so large graphs are
+        written without building the intermediate lists.
+        
+        Args:
+            fp: Binary file object to write to
+        """
+        fp.write(b'{"nodes":[')
+        self._write_records(fp, self._node_records())
+        fp.write(b'],"edges":[')
+        self._write_records(fp, self._edge_records())
+        fp.write(b'],"metrics":')
+        fp.write(orjson.dumps(self.get_graph_metrics(), default=str))
+        fp.write(b'}')
+    
+    @staticmethod
+    def _write_records(fp: BinaryIO, records: Iterator[Dict[str, Any]]) -> None:
+        """Write records as comma-separated JSON values."""
+        separator = b''
+        for record in records:
+            fp.write(separator)
+            fp.write(orjson.dumps(record, default=str))
+            separator = b','
@@ -0,0 +1,254 @@
+"""
+Graph Kernels - Compiled traversal loops over CSR/CSC index arrays.
+
+The kernels are JIT-compiled with Numba when it is installed. Callers check
+NUMBA_AVAILABLE and use their NumPy implementations otherwise, since these
+loops are too slow to run as plain Python.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def bfs_reachable(indptr, indices, seeds, n):
+    """
+    Mark every node reachable from seeds (seeds included).
+
+    Args:
+        indptr: CSR/CSC index pointer array
+        indices: CSR/CSC index array
+        seeds: Start node IDs
+        n: Number of nodes
+
+    Returns:
+        Boolean array of length n
+    """
+    visited = np.zeros(n, np.bool_)
+    stack = np.empty(n, np.int32)
+    top = 0
+
+    for s in seeds:
+        if not visited[s]:
+            visited[s] = True
+            stack[top] = s
+            top += 1
+
+    while top:
+        top -= 1
+        u = stack[top]
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            if not visited[v]:
+                visited[v] = True
+                stack[top] = v
+                top += 1
+
+    return visited
+
+
+@njit(cache=True)
+def topological_order(indptr, indices, indegree, n):
+    """
+    Kahn's algorithm over CSR arrays.
+
+    Args:
+        indptr: CSR index pointer array
+        indices: CSR index array
+        indegree: In-degree of each node (consumed)
+        n: Number of nodes
+
+    Returns:
+        Array of node IDs in topological order; shorter than n if the
+        graph has cycles
+    """
+    order = np.empty(n, np.int32)
+    head = 0
+    tail = 0
+
+    for u in range(n):
+        if indegree[u] == 0:
+            order[tail] = u
+            tail += 1
+
+    while head < tail:
+        u = order[head]
+        head += 1
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            indegree[v] -= 1
+            if indegree[v] == 0:
+                order[tail] = v
+                tail += 1
+
+    return order[:tail]
+
+
+@njit(cache=True)
+def node_counts(has_formula, is_input, sheet_codes, n_sheets):
+    """
+    Count formula nodes, input nodes and distinct sheets in one pass.
+
+    Args:
+        has_formula: Boolean mask of formula nodes
+        is_input: Boolean mask of input nodes
+        sheet_codes: Sheet code of each node, in range(n_sheets)
+        n_sheets: Number of sheet codes
+
+    Returns:
+        Tuple of (formula_count, input_count, sheet_count)
+    """
+    seen = np.zeros(n_sheets, np.bool_)
+    formula_count = 0
+    input_count = 0
+    sheet_count = 0
+
+    for i in range(has_formula.shape[0]):
+        if has_formula[i]:
+            formula_count += 1
+        if is_input[i]:
+            input_count += 1
+        code = sheet_codes[i]
+        if not seen[code]:
+            seen[code] = True
+            sheet_count += 1
+
+    return formula_count, input_count, sheet_count
+
+
+@njit(cache=True)
+def postorder(indptr, indices, roots):
+    """
+    Depth-first postorder of a DAG stored as CSR.
+    
+    Args:
+        indptr: CSR index pointer array
+        indices: CSR index array
+        roots: Start nodes, in the order to visit them
+        
+    Returns:
+        Array of node IDs, every node after all of its successors
+    """
+    n = indptr.shape[0] - 1
+    visited = np.zeros(n, np.bool_)
+    stack = np.empty(n, np.int64)
+    cursor = np.empty(n, np.int64)
+    order = np.empty(n, np.int64)
+    size = 0
+    
+    for root in roots:
+        if visited[root]:
+            continue
+        visited[root] = True
+        stack[0] = root
+        cursor[0] = indptr[root]
+        depth = 1
+        while depth:
+            node = stack[depth - 1]
+            k = cursor[depth - 1]
+            if k < indptr[node + 1]:
+                cursor[depth - 1] = k + 1
+                successor = indices[k]
+                if not visited[successor]:
+                    visited[successor] = True
+                    stack[depth] = successor
+                    cursor[depth] = indptr[successor]
+                    depth += 1
+            else:
+                depth -= 1
+                order[size] = node
+                size += 1
+    
+    return order[:size]
+
+
+@njit(cache=True)
+def _popcount64(x):
+    """Number of set bits in a uint64."""
+    x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (x * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+@njit(cache=True)
+def reach_counts(indptr, indices, pred_indptr, pred_indices, starts, words):
+    """
+    Count the nodes reachable from each component of a condensation.
+    
+    Components must be numbered in reverse topological order (successors
+    first), and component c owns node positions starts[c] to
+    starts[c + 1]. Reachable sets are propagated as bitsets over 64 * words
+    positions at a time, so memory stays at n_components * words * 8 bytes.
+    Each chunk only visits the ancestors of the components it covers.
+    
+    Args:
+        indptr: CSR index pointer array of the condensation
+        indices: CSR index array of the condensation
+        pred_indptr: CSC index pointer array of the condensation
+        pred_indices: CSC index array of the condensation
+        starts: First node position of each component, plus the total
+        words: Number of uint64 words per bitset chunk
+        
+    Returns:
+        Array of reachable node counts per component (own nodes included)
+    """
+    n = starts.shape[0] - 1
+    total = starts[n]
+    chunk = 64 * words
+    counts = np.zeros(n, np.int64)
+    masks = np.zeros((n, words), np.uint64)
+    stamp = np.full(n, -1, np.int64)
+    queue = np.empty(n, np.int64)
+    c_lo = 0
+    
+    for lo in range(0, total, chunk):
+        hi = lo + chunk
+        while starts[c_lo + 1] <= lo:
+            c_lo += 1
+        
+        # Only ancestors of the chunk's own components can reach into it
+        size = 0
+        c = c_lo
+        while c < n and starts[c] < hi:
+            stamp[c] = lo
+            queue[size] = c
+            size += 1
+            c += 1
+        head = 0
+        while head < size:
+            c = queue[head]
+            head += 1
+            for k in range(pred_indptr[c], pred_indptr[c + 1]):
+                p = pred_indices[k]
+                if stamp[p] != lo:
+                    stamp[p] = lo
+                    queue[size] = p
+                    size += 1
+        
+        for c in np.sort(queue[:size]):
+            row = masks[c]
+            row[:] = 0
+            for p in range(max(starts[c], lo) - lo, min(starts[c + 1], hi) - lo):
+                row[p >> 6] |= np.uint64(1) << np.uint64(p & 63)
+            for k in range(indptr[c], indptr[c + 1]):
+                s = indices[k]
+                if stamp[s] == lo:
+                    other = masks[s]
+                    for w in range(words):
+                        row[w] |= other[w]
+            for w in range(words):
+                counts[c] += np.int64(_popcount64(row[w]))
+    
+    return counts
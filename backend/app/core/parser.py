@@ -5,13 +5,20 @@ This module handles the parsing of Excel formulas into Abstract Syntax Trees (AS
 and extracts cell references, function calls, and other dependencies.
 """
 
+import logging
 import re
 from typing import List, Set, Dict, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 from ..utils import get_logger
 
-logger = get_logger(__name__)
+# Bound once here rather than per parser instance
+logger = get_logger(__name__).bind(component="FormulaParser")
+
+# Checked once at import so the hot path skips building debug events
+_DEBUG_ENABLED = logging.getLogger(__name__).isEnabledFor(logging.DEBUG)
+
+_VALID_CELL_RE = re.compile(r'^[A-Z]{1,3}(\d{1,7})$', re.IGNORECASE)
 
 
 class TokenType(Enum):
@@ -28,7 +35,7 @@ class TokenType(Enum):
     ERROR = "error"  # #REF!, #NAME!, etc.
 
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     """Represents a single token in a formula."""
     type: TokenType
@@ -39,7 +46,7 @@ class Token:
         return f"Token({self.type.value}, '{self.value}')"
 
 
-@dataclass
+@dataclass(slots=True)
 class CellReference:
     """Represents a cell reference with sheet context."""
     sheet: Optional[str]
@@ -47,19 +54,24 @@ class CellReference:
     row: int
     is_absolute_col: bool = False
     is_absolute_row: bool = False
+    _address: str = field(init=False, repr=False, compare=False)
     
-    def to_address(self) -> str:
-        """Convert to A1 notation."""
+    def __post_init__(self):
+        # Computed once; references are not modified after construction
         col = f"${self.col}" if self.is_absolute_col else self.col
         row = f"${self.row}" if self.is_absolute_row else str(self.row)
         addr = f"{col}{row}"
-        return f"{self.sheet}!{addr}" if self.sheet else addr
+        self._address = f"{self.sheet}!{addr}" if self.sheet else addr
+    
+    def to_address(self) -> str:
+        """Convert to A1 notation."""
+        return self._address
     
     def __hash__(self):
-        return hash(self.to_address())
+        return hash(self._address)
     
     def __eq__(self, other):
-        return self.to_address() == other.to_address()
+        return self._address == other._address
 
 
 class FormulaParser:
@@ -96,11 +108,29 @@ class FormulaParser:
         re.IGNORECASE
     )
     
+    # All token classes in one alternation so a formula is scanned once;
+    # earlier alternatives win, so sheet refs and ranges are never re-read
+    # as plain cells and string literals are consumed whole
+    _SHEET_REF_ALT = r"(?P<sheetref>(?P<sheet>'[^']+'|\w+)!(?P<sheetcells>\$?[A-Z]+\$?\d+(?::\$?[A-Z]+\$?\d+)?))|"
+    _RANGE_ALT = r"(?P<range>\$?[A-Z]+\$?\d+:\$?[A-Z]+\$?\d+)|"
+    _BASE_ALTS = (
+        r"(?P<func>[A-Z_][A-Z0-9_.]*)\s*\("
+        r"|(?P<cell>\$?[A-Z]+\$?\d+)"
+        r'|(?P<str>"[^"]*")'
+    )
+    
+    COMBINED_PATTERN = re.compile(_SHEET_REF_ALT + _RANGE_ALT + _BASE_ALTS, re.IGNORECASE)
+    
+    # Reduced alternations for formulas without '!' or ':', which cannot
+    # contain sheet or range references; most formulas take one of these
+    NO_SHEET_PATTERN = re.compile(_RANGE_ALT + _BASE_ALTS, re.IGNORECASE)
+    LOCAL_CELL_PATTERN = re.compile(_BASE_ALTS, re.IGNORECASE)
+    
     # Dynamic functions that require special handling
     DYNAMIC_FUNCTIONS = {'INDIRECT', 'OFFSET', 'INDEX', 'CHOOSE', 'VLOOKUP', 'HLOOKUP'}
     
     def __init__(self):
-        self.logger = logger.bind(component="FormulaParser")
+        self.logger = logger
     
     def parse(self, formula: str, current_sheet: Optional[str] = None) -> Dict[str, any]:
         """
@@ -128,21 +158,20 @@ class FormulaParser:
         # Remove leading = if present
         formula = formula.lstrip('=').strip()
         
-        # Extract all components
-        dependencies = self._extract_dependencies(formula, current_sheet)
-        functions = self._extract_functions(formula)
-        tokens = self._tokenize(formula)
+        # Extract all components in a single scan
+        dependencies, functions, tokens = self._scan(formula, current_sheet)
         
         # Check if formula uses dynamic functions
         is_dynamic = any(func.upper() in self.DYNAMIC_FUNCTIONS for func in functions)
         
-        self.logger.debug(
-            "Parsed formula",
-            formula=formula[:50],
-            dep_count=len(dependencies),
-            func_count=len(functions),
-            is_dynamic=is_dynamic
-        )
+        if _DEBUG_ENABLED:
+            self.logger.debug(
+                "Parsed formula",
+                formula=formula[:50],
+                dep_count=len(dependencies),
+                func_count=len(functions),
+                is_dynamic=is_dynamic
+            )
         
         return {
             "dependencies": dependencies,
@@ -152,58 +181,73 @@ class FormulaParser:
             "formula": formula
         }
     
-    def _extract_dependencies(self, formula: str, current_sheet: Optional[str]) -> Set[CellReference]:
-        """Extract all cell and range references from formula."""
+    def _scan(
+        self,
+        formula: str,
+        current_sheet: Optional[str]
+    ) -> Tuple[Set[CellReference], List[str], List[Token]]:
+        """Extract dependencies, function names and tokens in one regex pass."""
         dependencies = set()
+        functions = []
+        tokens = []
+        
+        if '!' in formula:
+            pattern = self.COMBINED_PATTERN
+        elif ':' in formula:
+            pattern = self.NO_SHEET_PATTERN
+        else:
+            pattern = self.LOCAL_CELL_PATTERN
         
-        # First, extract cross-sheet references
-        for match in self.SHEET_REF_PATTERN.finditer(formula):
-            sheet_part = match.group(1).strip("'\"!")
-            ref_part = match.group(2)
+        for match in pattern.finditer(formula):
+            kind = match.lastgroup
+            
+            if kind == 'sheetref':
+                sheet = match.group('sheet').strip("'")
+                for ref in match.group('sheetcells').split(':'):
+                    dependencies.add(self._parse_cell_ref(ref, sheet))
+                tokens.append(Token(TokenType.SHEET_REF, match.group(0), match.start()))
+            
+            elif kind == 'range':
+                range_ref = match.group('range')
+                start, end = range_ref.split(':')
+                dependencies.add(self._parse_cell_ref(start, current_sheet))
+                dependencies.add(self._parse_cell_ref(end, current_sheet))
+                tokens.append(Token(TokenType.RANGE_REF, range_ref, match.start()))
+            
+            elif kind == 'func':
+                func_name = match.group('func')
+                functions.append(func_name.upper())
+                tokens.append(Token(TokenType.FUNCTION, func_name, match.start()))
+            
+            elif kind == 'cell':
+                cell_ref = match.group('cell')
+                # Filter out things that look like cell refs but aren't (e.g., XYZW1)
+                if self._is_valid_cell_ref(cell_ref):
+                    dependencies.add(self._parse_cell_ref(cell_ref, current_sheet))
+                    tokens.append(Token(TokenType.CELL_REF, cell_ref, match.start()))
             
-            # Handle range references
-            if ':' in ref_part:
-                start, end = ref_part.split(':')
-                dependencies.add(self._parse_cell_ref(start, sheet_part))
-                dependencies.add(self._parse_cell_ref(end, sheet_part))
             else:
-                dependencies.add(self._parse_cell_ref(ref_part, sheet_part))
-        
-        # Remove cross-sheet references from formula for next step
-        formula_no_sheets = self.SHEET_REF_PATTERN.sub('', formula)
-        
-        # Extract range references
-        for match in self.RANGE_PATTERN.finditer(formula_no_sheets):
-            range_ref = match.group(1)
-            start, end = range_ref.split(':')
-            dependencies.add(self._parse_cell_ref(start, current_sheet))
-            dependencies.add(self._parse_cell_ref(end, current_sheet))
-        
-        # Remove ranges for final cell extraction
-        formula_no_ranges = self.RANGE_PATTERN.sub('', formula_no_sheets)
-        
-        # Extract individual cell references
-        for match in self.CELL_PATTERN.finditer(formula_no_ranges):
-            cell_ref = match.group(1)
-            # Filter out things that look like cell refs but aren't (e.g., in strings)
-            if self._is_valid_cell_ref(cell_ref):
-                dependencies.add(self._parse_cell_ref(cell_ref, current_sheet))
+                # String literal - its contents are not references
+                tokens.append(Token(TokenType.STRING, match.group('str'), match.start()))
         
-        return dependencies
+        return dependencies, functions, tokens
     
     def _parse_cell_ref(self, ref: str, sheet: Optional[str]) -> CellReference:
         """Parse a cell reference string into CellReference object."""
-        # Handle absolute references
+        # Single scan: [$]letters[$]digits
+        n = len(ref)
         is_absolute_col = ref[0] == '$'
-        ref_no_col_abs = ref[1:] if is_absolute_col else ref
+        i = 1 if is_absolute_col else 0
         
-        # Split into column and row
-        col_match = re.match(r'([A-Z]+)', ref_no_col_abs, re.IGNORECASE)
-        col = col_match.group(1).upper() if col_match else 'A'
+        j = i
+        while j < n and ref[j].isalpha():
+            j += 1
+        col = ref[i:j].upper() or 'A'
         
-        row_part = ref_no_col_abs[len(col):]
-        is_absolute_row = row_part.startswith('$')
-        row = int(row_part.lstrip('$')) if row_part.lstrip('$') else 1
+        is_absolute_row = j < n and ref[j] == '$'
+        if is_absolute_row:
+            j += 1
+        row = int(ref[j:]) if j < n else 1
         
         return CellReference(
             sheet=sheet,
@@ -213,78 +257,22 @@ class FormulaParser:
             is_absolute_row=is_absolute_row
         )
     
-    def _extract_functions(self, formula: str) -> List[str]:
-        """Extract all function names from formula."""
-        functions = []
-        for match in self.FUNCTION_PATTERN.finditer(formula):
-            func_name = match.group(1).upper()
-            functions.append(func_name)
-        return functions
-    
-    def _tokenize(self, formula: str) -> List[Token]:
-        """Tokenize formula into individual tokens."""
-        tokens = []
-        position = 0
-        
-        # This is a simplified tokenizer
-        # A production version would use a proper lexer
-        
-        # For now, just identify major token types
-        for match in self.FUNCTION_PATTERN.finditer(formula):
-            tokens.append(Token(
-                type=TokenType.FUNCTION,
-                value=match.group(1),
-                position=match.start()
-            ))
-        
-        for match in self.SHEET_REF_PATTERN.finditer(formula):
-            tokens.append(Token(
-                type=TokenType.SHEET_REF,
-                value=match.group(0),
-                position=match.start()
-            ))
-        
-        for match in self.RANGE_PATTERN.finditer(formula):
-            tokens.append(Token(
-                type=TokenType.RANGE_REF,
-                value=match.group(1),
-                position=match.start()
-            ))
-        
-        for match in self.CELL_PATTERN.finditer(formula):
-            if self._is_valid_cell_ref(match.group(1)):
-                tokens.append(Token(
-                    type=TokenType.CELL_REF,
-                    value=match.group(1),
-                    position=match.start()
-                ))
-        
-        # Sort by position
-        tokens.sort(key=lambda t: t.position)
-        return tokens
-    
     def _is_valid_cell_ref(self, ref: str) -> bool:
         """Check if a string is a valid cell reference."""
         # Remove $ signs
-        ref_clean = ref.replace('$', '')
+        ref_clean = ref.replace('$', '') if '$' in ref else ref
         
-        # Must have letters followed by numbers
-        match = re.match(r'^([A-Z]+)(\d+)$', ref_clean, re.IGNORECASE)
-        if not match:
+        # Shortest is A1, longest is XFD1048576
+        if len(ref_clean) < 2 or len(ref_clean) > 10:
             return False
         
-        col, row = match.groups()
-        
-        # Column must be valid (A-XFD for Excel)
-        if len(col) > 3:
+        # 1-3 column letters (A-XFD for Excel) followed by the row number
+        match = _VALID_CELL_RE.match(ref_clean)
+        if not match:
             return False
         
         # Row must be valid (1-1048576 for Excel)
-        try:
-            row_num = int(row)
-            return 1 <= row_num <= 1048576
-        except ValueError:
-            return False
+        return 1 <= int(match.group(1)) <= 1048576
     
     def extract_dynamic_dependencies(
         self,
@@ -336,10 +324,11 @@ class FormulaParser:
             if self._is_valid_cell_ref(base_ref):
                 dynamic_deps.add(self._parse_cell_ref(base_ref, current_sheet))
         
-        self.logger.debug(
-            "Extracted dynamic dependencies",
-            formula=formula[:50],
-            dynamic_dep_count=len(dynamic_deps)
-        )
+        if _DEBUG_ENABLED:
+            self.logger.debug(
+                "Extracted dynamic dependencies",
+                formula=formula[:50],
+                dynamic_dep_count=len(dynamic_deps)
+            )
         
         return dynamic_deps
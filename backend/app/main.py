@@ -4,25 +4,52 @@ FastAPI application entry point for Formula Intelligence.
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+import aiojobs
+import asyncio
+import importlib
 import time
 import uuid
 
 from .utils import settings, get_logger, setup_logging
 from .api import routes
+from .core import shutdown_parse_executor
+from .services import job_store, result_cache, reap_expired_jobs
 
 # Setup logging
 setup_logging()
 logger = get_logger(__name__)
 
+# Heavy modules the analysis path imports lazily; loaded in the background
+# at startup so the first analysis does not pay for them
+WARM_IMPORTS = ("pandas", "app.core.graph_kernels")
+
+
+def warm_imports() -> None:
+    """Import the lazily loaded analysis dependencies."""
+    for module in WARM_IMPORTS:
+        importlib.import_module(module)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     logger.info("Starting Formula Intelligence API", version=settings.APP_VERSION)
+    # Bounded scheduler for in-process analyses
+    app.state.scheduler = aiojobs.Scheduler(limit=settings.MAX_CONCURRENT_ANALYSES)
+    # Periodically drop finished jobs so the job store stays bounded
+    reaper = asyncio.create_task(reap_expired_jobs(settings.JOB_REAP_INTERVAL))
+    # Load heavy dependencies off the event loop; requests are served meanwhile
+    warmup = asyncio.create_task(asyncio.to_thread(warm_imports))
     yield
     logger.info("Shutting down Formula Intelligence API")
+    reaper.cancel()
+    warmup.cancel()
+    await app.state.scheduler.close()
+    await job_store.close()
+    await result_cache.close()
+    await asyncio.to_thread(shutdown_parse_executor)
 
 
 # Create FastAPI application
@@ -31,18 +58,20 @@ app = FastAPI(
     version=settings.APP_VERSION,
     description="High-performance Excel dependency analysis and visualization",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
 )
 
 # Configure CORS
+# Origins are kept in a frozenset: the middleware checks membership per request
 cors_origins = settings.CORS_ORIGINS
 if cors_origins == "*":
-    allow_origins = ["*"]
+    allow_origins = frozenset({"*"})
     allow_credentials = False  # Cannot use credentials with wildcard
 else:
     # Parse comma-separated origins or use as-is if it's already a list
-    allow_origins = [origin.strip() for origin in cors_origins.split(",")] if isinstance(cors_origins, str) else cors_origins
+    allow_origins = frozenset(origin.strip() for origin in cors_origins.split(",")) if isinstance(cors_origins, str) else frozenset(cors_origins)
     allow_credentials = False  # Disable credentials for now
 
 app.add_middleware(
@@ -54,6 +83,23 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Reject oversize uploads before the body is read
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Return 400 when Content-Length exceeds the upload size limit."""
+    content_length = request.headers.get("content-length")
+    max_size = settings.MAX_FILE_SIZE_MB * 1024 * 1024
+    
+    if content_length and content_length.isdigit() and int(content_length) > max_size:
+        # Same status as the check while saving (routes.save_upload)
+        return ORJSONResponse(
+            status_code=400,
+            content={"detail": f"File too large. Maximum size: {settings.MAX_FILE_SIZE_MB}MB"}
+        )
+    
+    return await call_next(request)
+
+
 # Add CORS headers to all responses
 @app.middleware("http")
 async def add_cors_headers(request: Request, call_next):
@@ -114,7 +160,7 @@ async def global_exception_handler(request: Request, exc: Exception):
         method=request.method
     )
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal server error",
@@ -12,6 +12,7 @@ from .schemas import (
     AnomalySummary,
     CostDriverModel,
     CostDriverSummary,
+    MetricsSummary,
     DependencyQuery,
     DependencyResponse,
     HealthCheck,
@@ -29,6 +30,7 @@ __all__ = [
     "AnomalySummary",
     "CostDriverModel",
     "CostDriverSummary",
+    "MetricsSummary",
     "DependencyQuery",
     "DependencyResponse",
     "HealthCheck",
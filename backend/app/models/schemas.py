@@ -2,12 +2,22 @@
 Pydantic models for API request/response schemas.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 
-class AnalysisRequest(BaseModel):
+class SchemaModel(BaseModel):
+    """
+    Base for the API schemas.
+    
+    Validators are built on first use instead of at import, which keeps
+    application startup fast; unknown fields are ignored.
+    """
+    model_config = ConfigDict(defer_build=True, extra='ignore', populate_by_name=True)
+
+
+class AnalysisRequest(SchemaModel):
     """Request model for analysis endpoint."""
     include_values: bool = Field(default=False, description="Include cell values in graph")
     detect_anomalies: bool = Field(default=True, description="Run anomaly detection")
@@ -15,7 +25,7 @@ class AnalysisRequest(BaseModel):
     top_drivers_count: int = Field(default=50, description="Number of top cost drivers to return")
 
 
-class GraphNode(BaseModel):
+class GraphNode(SchemaModel):
     """Graph node model."""
     id: str
     sheet: str
@@ -28,14 +38,14 @@ class GraphNode(BaseModel):
     is_output: bool
 
 
-class GraphEdge(BaseModel):
+class GraphEdge(SchemaModel):
     """Graph edge model."""
     source: str
     target: str
     type: str  # 'static' or 'dynamic'
 
 
-class GraphMetrics(BaseModel):
+class GraphMetrics(SchemaModel):
     """Graph metrics model."""
     node_count: int
     edge_count: int
@@ -46,14 +56,14 @@ class GraphMetrics(BaseModel):
     avg_degree: float
 
 
-class GraphData(BaseModel):
+class GraphData(SchemaModel):
     """Complete graph data model."""
     nodes: List[GraphNode]
     edges: List[GraphEdge]
     metrics: GraphMetrics
 
 
-class AnomalyModel(BaseModel):
+class AnomalyModel(SchemaModel):
     """Anomaly model."""
     type: str
     severity: str
@@ -64,7 +74,7 @@ class AnomalyModel(BaseModel):
     metadata: Dict[str, Any] = {}
 
 
-class AnomalySummary(BaseModel):
+class AnomalySummary(SchemaModel):
     """Summary of detected anomalies."""
     total_count: int
     by_type: Dict[str, int]
@@ -72,7 +82,7 @@ class AnomalySummary(BaseModel):
     anomalies: List[AnomalyModel]
 
 
-class CostDriverModel(BaseModel):
+class CostDriverModel(SchemaModel):
     """Cost driver model."""
     cell_address: str
     sheet: str
@@ -85,7 +95,7 @@ class CostDriverModel(BaseModel):
     description: str
 
 
-class CostDriverSummary(BaseModel):
+class CostDriverSummary(SchemaModel):
     """Summary of cost drivers."""
     total_drivers: int
     top_drivers: List[CostDriverModel]
@@ -94,7 +104,7 @@ class CostDriverSummary(BaseModel):
     cluster_summary: Dict[int, Dict[str, Any]]
 
 
-class MetricsSummary(BaseModel):
+class MetricsSummary(SchemaModel):
     """Summary of analysis metrics."""
     formula_count: int
     input_count: int
@@ -102,7 +112,7 @@ class MetricsSummary(BaseModel):
     avg_complexity: float
 
 
-class AnalysisResult(BaseModel):
+class AnalysisResult(SchemaModel):
     """Complete analysis result."""
     job_id: str
     status: str  # 'processing', 'completed', 'failed'
@@ -118,7 +128,7 @@ class AnalysisResult(BaseModel):
     processing_time: Optional[float] = None
 
 
-class AnalysisStatus(BaseModel):
+class AnalysisStatus(SchemaModel):
     """Status of an analysis job."""
     job_id: str
     status: str
@@ -126,13 +136,13 @@ class AnalysisStatus(BaseModel):
     message: str
 
 
-class DependencyQuery(BaseModel):
+class DependencyQuery(SchemaModel):
     """Query for cell dependencies."""
     cell_address: str
     recursive: bool = Field(default=False, description="Include transitive dependencies")
 
 
-class DependencyResponse(BaseModel):
+class DependencyResponse(SchemaModel):
     """Response for dependency query."""
     cell_address: str
     dependencies: List[str]
@@ -141,7 +151,7 @@ class DependencyResponse(BaseModel):
     dependent_count: int
 
 
-class HealthCheck(BaseModel):
+class HealthCheck(SchemaModel):
     """Health check response."""
     status: str
     version: str
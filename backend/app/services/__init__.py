@@ -1,5 +1,18 @@
 """Services package initialization."""
 
 from .analysis_service import analysis_service
+from .job_store import JobStore, InMemoryJobStore, RedisJobStore, job_store, get_job_store, reap_expired_jobs, requeue_stale_jobs
+from .result_cache import ResultCache, result_cache
 
-__all__ = ["analysis_service"]
+__all__ = [
+    "analysis_service",
+    "JobStore",
+    "InMemoryJobStore",
+    "RedisJobStore",
+    "job_store",
+    "get_job_store",
+    "reap_expired_jobs",
+    "requeue_stale_jobs",
+    "ResultCache",
+    "result_cache",
+]
@@ -2,18 +2,109 @@
 Analysis Service - Orchestrates the complete analysis workflow.
 """
 
+import asyncio
+import io
+import sys
 import time
-from typing import Dict, Any, Callable, Optional
+import zipfile
+import numpy as np
+import orjson
+from typing import Dict, Any, Callable, List, Optional, Set, Tuple
 from ..core import (
     FormulaParser,
     DAGBuilder,
     AnomalyDetector,
     CostDriverAnalyzer,
 )
-from ..utils import get_logger
+from ..utils import settings, get_logger
+from .result_cache import result_cache
 
 logger = get_logger(__name__)
 
+try:
+    from lxml.etree import iterparse, XMLSyntaxError as XMLParseError
+    LXML_AVAILABLE = True
+except ImportError:
+    from xml.etree.ElementTree import iterparse, ParseError as XMLParseError
+    LXML_AVAILABLE = False
+
+# SpreadsheetML tags read by the streaming .xlsx reader
+_SHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_CELL_TAG = _SHEET_NS + "c"
+_ROW_TAG = _SHEET_NS + "row"
+_SHEET_DATA_TAG = _SHEET_NS + "sheetData"
+_SHARED_STRING_TABLE_TAG = _SHEET_NS + "sst"
+_FORMULA_TAG = _SHEET_NS + "f"
+_VALUE_TAG = _SHEET_NS + "v"
+_INLINE_STRING_TAG = _SHEET_NS + "is"
+_SHARED_STRING_TAG = _SHEET_NS + "si"
+_TEXT_TAG = _SHEET_NS + "t"
+_RICH_TEXT_PATH = f"{_SHEET_NS}r/{_TEXT_TAG}"
+
+
+def _column_letter(col_num: int) -> str:
+    """Convert column number to letter (0 -> A, 25 -> Z, 26 -> AA)."""
+    result = ""
+    while col_num >= 0:
+        result = chr(col_num % 26 + 65) + result
+        col_num = col_num // 26 - 1
+        if col_num < 0:
+            break
+    return result
+
+
+# Letters of every Excel column (A-XFD), indexed from 0
+_COL_LETTERS = tuple(_column_letter(i) for i in range(16384))
+
+# Strings of the small ints most cells hold, shared instead of calling str()
+_SMALL_INT_MIN = -128
+_SMALL_INT_MAX = 1024
+_SMALL_INT_STRINGS = tuple(str(i) for i in range(_SMALL_INT_MIN, _SMALL_INT_MAX + 1))
+
+# 1-indexed column number of every column letter
+_COL_NUMBERS = {letter: idx + 1 for idx, letter in enumerate(_COL_LETTERS)}
+
+# Cell data types, stored per cell as a uint8 index into this tuple
+CELL_DATA_TYPES = (
+    "str", "int", "float", "bool", "datetime", "date", "time", "timedelta",
+    "error", "blank", "empty", "other",
+)
+_DATA_TYPE_CODES = {name: code for code, name in enumerate(CELL_DATA_TYPES)}
+_OTHER_DATA_TYPE = _DATA_TYPE_CODES["other"]
+
+
+def _columnar_sheet(
+    name: str,
+    rows: List[int],
+    cols: List[str],
+    values: List[str],
+    formulas: List[Optional[str]],
+    data_types: List[int],
+    row_count: int,
+    col_count: int,
+) -> Dict[str, Any]:
+    """
+    Build a sheet dictionary with one parallel column per cell field.
+    
+    rows is an int32 array and data_types a uint8 array of CELL_DATA_TYPES
+    codes; cols, values and formulas stay Python lists of strings.
+    """
+    return {
+        "name": name,
+        "rows": np.asarray(rows, dtype=np.int32),
+        "cols": cols,
+        "values": values,
+        "formulas": formulas,
+        "data_types": np.asarray(data_types, dtype=np.uint8),
+        "row_count": row_count,
+        "col_count": col_count,
+    }
+
+
+async def _skipped() -> Tuple[None, int]:
+    """Result of an analysis step that was not requested."""
+    return None, 0
+
 
 class AnalysisService:
     """
@@ -31,6 +122,7 @@ class AnalysisService:
         identify_cost_drivers: bool = True,
         top_drivers_count: int = 50,
         progress_callback: Optional[Callable[[int, str], None]] = None,
+        graph_as_json: bool = False,
     ) -> Dict[str, Any]:
         """
         Perform complete workbook analysis.
@@ -42,80 +134,95 @@ class AnalysisService:
             identify_cost_drivers: Run cost driver analysis
             top_drivers_count: Number of top drivers to return
             progress_callback: Callback for progress updates
+            graph_as_json: Return the graph as an orjson.Fragment of
+                pre-encoded JSON instead of a dict, for results that are
+                only serialized again
             
         Returns:
             Dictionary with analysis results
         """
         self.logger.info("Starting workbook analysis", file_path=file_path)
         
+        # Throttling is left to the callback (see routes.process_analysis)
+        def _emit(pct: int, message: str) -> None:
+            if progress_callback is not None:
+                progress_callback(pct, message)
+        
         try:
+            # Identical files analysed with the same options reuse the result
+            cache_key = None
+            if result_cache.enabled:
+                cache_key = await asyncio.to_thread(
+                    result_cache.make_key, file_path, include_values,
+                    detect_anomalies, identify_cost_drivers, top_drivers_count
+                )
+                cached = await result_cache.get(cache_key)
+                if cached is not None:
+                    _emit(100, "Analysis complete")
+                    self.logger.info("Using cached analysis result")
+                    return cached
+            
             # Step 1: Read Excel file (10-30%)
-            if progress_callback:
-                progress_callback(10, "Reading Excel file")
+            _emit(10, "Reading Excel file")
             
             sheets_data = await self._read_excel(file_path)
             
-            if progress_callback:
-                progress_callback(30, f"Read {len(sheets_data)} sheets")
+            _emit(30, f"Read {len(sheets_data)} sheets")
             
             # Step 2: Build dependency graph (30-60%)
-            if progress_callback:
-                progress_callback(35, "Building dependency graph")
+            _emit(35, "Building dependency graph")
             
             dag_builder = DAGBuilder()
-            graph = dag_builder.build_graph(sheets_data, include_values)
+            await dag_builder.build_async(sheets_data, include_values)
             
-            if progress_callback:
-                progress_callback(60, "Dependency graph complete")
+            _emit(60, "Dependency graph complete")
             
-            # Step 3: Detect anomalies (60-75%)
-            anomalies_result = None
-            if detect_anomalies:
-                if progress_callback:
-                    progress_callback(65, "Detecting anomalies")
-                
-                detector = AnomalyDetector(graph)
-                anomalies = detector.detect_all(sheets_data)
-                anomalies_result = detector.export_to_dict()
-                
-                if progress_callback:
-                    progress_callback(75, f"Found {len(anomalies)} anomalies")
+            # Steps 3-4: Detect anomalies and identify cost drivers (60-90%).
+            # Both only read the graph, so they run concurrently
+            if detect_anomalies or identify_cost_drivers:
+                _emit(65, "Detecting anomalies and identifying cost drivers")
+            
+            (anomalies_result, anomaly_count), (cost_drivers_result, driver_count) = await asyncio.gather(
+                asyncio.to_thread(self._run_anomalies, dag_builder, sheets_data)
+                if detect_anomalies else _skipped(),
+                asyncio.to_thread(self._run_drivers, dag_builder, top_drivers_count)
+                if identify_cost_drivers else _skipped(),
+            )
             
-            # Step 4: Identify cost drivers (75-90%)
-            cost_drivers_result = None
+            if detect_anomalies:
+                _emit(75, f"Found {anomaly_count} anomalies")
             if identify_cost_drivers:
-                if progress_callback:
-                    progress_callback(80, "Identifying cost drivers")
-                
-                analyzer = CostDriverAnalyzer(graph)
-                drivers = analyzer.analyze(top_n=top_drivers_count)
-                cost_drivers_result = analyzer.export_to_dict()
-                
-                if progress_callback:
-                    progress_callback(90, f"Identified {len(drivers)} cost drivers")
+                _emit(90, f"Identified {driver_count} cost drivers")
             
             # Step 5: Prepare results (90-100%)
-            if progress_callback:
-                progress_callback(95, "Preparing results")
+            _emit(95, "Preparing results")
+            
+            # The job path only re-serializes the graph, so it is streamed
+            # to JSON record by record instead of built as lists of dicts
+            if graph_as_json:
+                buffer = io.BytesIO()
+                dag_builder.export_to_json(buffer)
+                graph_data = orjson.Fragment(buffer.getvalue())
+            else:
+                graph_data = dag_builder.export_to_dict()
             
-            # Calculate metrics
-            graph_dict = dag_builder.export_to_dict()
+            # Calculate metrics from the node masks instead of the records
             metrics = {
-                "formula_count": sum(1 for node in graph_dict.get("nodes", []) if node.get("has_formula")),
-                "input_count": sum(1 for node in graph_dict.get("nodes", []) if node.get("is_input")),
-                "sheet_count": len(set(node.get("sheet") for node in graph_dict.get("nodes", []))),
+                **dag_builder.get_node_counts(),
                 "avg_complexity": 0.0,  # Placeholder
             }
             
             result = {
-                "graph": graph_dict,
+                "graph": graph_data,
                 "anomalies": anomalies_result,
                 "cost_drivers": cost_drivers_result,
                 "metrics": metrics,
             }
             
-            if progress_callback:
-                progress_callback(100, "Analysis complete")
+            if cache_key is not None:
+                await result_cache.set(cache_key, result)
+            
+            _emit(100, "Analysis complete")
             
             self.logger.info("Workbook analysis complete")
             
@@ -125,49 +232,73 @@ class AnalysisService:
             self.logger.error("Analysis failed", error=str(e))
             raise
     
+    def _run_anomalies(
+        self,
+        dag_builder: DAGBuilder,
+        sheets_data: list
+    ) -> Tuple[Dict[str, Any], int]:
+        """Detect anomalies; returns the exported summary and the anomaly count."""
+        detector = AnomalyDetector(dag_builder)
+        anomalies = detector.detect_all(sheets_data)
+        return detector.export_to_dict(), len(anomalies)
+    
+    def _run_drivers(self, dag_builder: DAGBuilder, top_n: int) -> Tuple[Dict[str, Any], int]:
+        """Identify cost drivers; returns the exported summary and the driver count."""
+        analyzer = CostDriverAnalyzer(dag_builder)
+        drivers = analyzer.analyze(top_n=top_n)
+        return analyzer.export_to_dict(), len(drivers)
+    
     async def _read_excel(self, file_path: str) -> list:
         """
-        Read Excel file using Rust reader.
+        Read Excel file, using the Rust reader when it is enabled.
+        
+        Falls back to the Python readers if the extension is not installed,
+        the file is not .xlsx/.xlsm, or the Rust reader fails.
         
         Returns list of sheet dictionaries.
         """
-        try:
-            # Import Rust extension
-            # import excel_reader
-            # reader = excel_reader.ExcelReader(file_path)
-            # reader.parse()
-            
-            # FORCE FALLBACK to openpyxl because Rust reader fails to extract formulas correctly (it reads values)
-            raise ImportError("Forcing openpyxl fallback for correct formula extraction")
-            
-            sheets = reader.get_sheets()
-            
-            # Convert to dictionary format
-            sheets_data = []
-            for sheet in sheets:
-                cells = []
-                for cell in sheet.cells:
-                    cells.append({
-                        "row": cell.row,
-                        "col": self._col_num_to_letter(cell.col),
-                        "value": cell.value,
-                        "formula": cell.formula,
-                        "data_type": cell.data_type,
-                    })
-                
-                sheets_data.append({
-                    "name": sheet.name,
-                    "cells": cells,
-                    "row_count": sheet.row_count,
-                    "col_count": sheet.col_count,
-                })
-            
-            return sheets_data
-            
-        except ImportError:
-            # Fallback to openpyxl if Rust extension not available
-            self.logger.warning("Rust reader not available, using openpyxl")
-            return await self._read_excel_fallback(file_path)
+        import os
+        
+        file_ext = os.path.splitext(file_path)[1].lower()
+        if settings.USE_RUST_READER and file_ext in (".xlsx", ".xlsm"):
+            try:
+                return await asyncio.to_thread(self._read_excel_rust, file_path)
+            except ImportError:
+                # Fallback to openpyxl if Rust extension not available
+                self.logger.warning("Rust reader not available, using openpyxl")
+            except Exception as e:
+                self.logger.warning("Rust reader failed, using openpyxl", error=str(e))
+        
+        return await self._read_excel_fallback(file_path)
+    
+    def _read_excel_rust(self, file_path: str) -> list:
+        """
+        Read an .xlsx/.xlsm workbook with the Rust excel_reader extension.
+        
+        Raises:
+            ImportError: if the extension is not installed
+        """
+        import excel_reader
+        
+        reader = excel_reader.ExcelReader(file_path)
+        reader.parse(include_formulas=True)
+        
+        # Convert to columnar sheet format
+        sheets_data = []
+        for sheet in reader.get_sheets():
+            cells = sheet.cells
+            sheets_data.append(_columnar_sheet(
+                sheet.name,
+                rows=[cell.row for cell in cells],
+                cols=[self._col_num_to_letter(cell.col) for cell in cells],
+                values=[cell.value for cell in cells],
+                formulas=[cell.formula for cell in cells],
+                data_types=[_DATA_TYPE_CODES.get(cell.data_type, _OTHER_DATA_TYPE) for cell in cells],
+                row_count=sheet.row_count,
+                col_count=sheet.col_count,
+            ))
+        
+        return sheets_data
     
     async def _read_excel_fallback(self, file_path: str) -> list:
         """Fallback Excel reader using openpyxl or xlrd."""
@@ -177,105 +308,436 @@ class AnalysisService:
         file_ext = os.path.splitext(file_path)[1].lower()
         
         if file_ext == '.xls':
-            # Use xlrd for old .xls files
+            return await asyncio.to_thread(self._read_xls, file_path)
+        else:
+            # Stream the sheet XML directly; openpyxl handles anything the
+            # streaming reader cannot
             try:
-                import xlrd
+                return await asyncio.to_thread(self._read_xlsx_stream, file_path)
+            except (XMLParseError, LookupError, ValueError, zipfile.BadZipFile) as e:
+                self.logger.warning("Streaming reader failed, using openpyxl", error=str(e))
+            
+            # Use openpyxl for .xlsx, .xlsm files
+            import openpyxl
+            
+            # Load formulas with openpyxl and calculated values (calamine, or a
+            # second openpyxl pass) concurrently in worker threads. The
+            # formulas workbook is read-only: cells are streamed from the XML
+            # instead of building the full in-memory sheet model.
+            wb_formulas, (cached_values, wb_values) = await asyncio.gather(
+                asyncio.to_thread(
+                    openpyxl.load_workbook, file_path,
+                    read_only=True, data_only=False, keep_links=False
+                ),
+                asyncio.to_thread(self._load_values, file_path),
+            )
+            
+            # Walking the cells is CPU-bound; keep it off the event loop
+            try:
+                return await asyncio.to_thread(
+                    self._extract_cells, wb_formulas, cached_values, wb_values
+                )
+            finally:
+                # Read-only workbooks keep the archive open until closed
+                wb_formulas.close()
+    
+    def _read_xlsx_stream(self, file_path: str) -> list:
+        """
+        Read an .xlsx/.xlsm workbook by streaming its worksheet XML.
+        
+        Cells are taken straight from the <c> elements with iterparse, so no
+        per-cell objects are built and formula results come from the cached
+        <v> values instead of a second workbook load. Workbook structure and
+        number formats are read with openpyxl's parsers.
+        
+        Raises:
+            LookupError, ValueError, XMLParseError, zipfile.BadZipFile: if
+                the file cannot be read this way
+        """
+        from openpyxl.reader.workbook import WorkbookParser
+        from openpyxl.styles.stylesheet import Stylesheet
+        from openpyxl.xml.constants import ARC_SHARED_STRINGS, ARC_STYLE, ARC_WORKBOOK
+        from openpyxl.xml.functions import fromstring
+        
+        with zipfile.ZipFile(file_path) as archive:
+            names = set(archive.namelist())
+            
+            workbook = WorkbookParser(archive, ARC_WORKBOOK, keep_links=False)
+            workbook.parse()
+            
+            shared_strings: List[str] = []
+            if ARC_SHARED_STRINGS in names:
+                with archive.open(ARC_SHARED_STRINGS) as fh:
+                    shared_strings = self._read_shared_strings(fh)
+            
+            date_styles: Set[int] = set()
+            timedelta_styles: Set[int] = set()
+            if ARC_STYLE in names:
+                stylesheet = Stylesheet.from_tree(fromstring(archive.read(ARC_STYLE)))
+                date_styles = stylesheet.date_formats
+                timedelta_styles = stylesheet.timedelta_formats
+            
+            # Shared across sheets, like the openpyxl path
+            formula_intern: Dict[str, str] = {}
+            type_codes: Dict[type, int] = {}
+            
+            sheets_data = []
+            for sheet, rel in workbook.find_sheets():
+                # Chartsheets and dangling relationships have no cells
+                if "chartsheet" in rel.Type or rel.target not in names:
+                    continue
                 
-                wb = xlrd.open_workbook(file_path)
-                sheets_data = []
+                with archive.open(rel.target) as fh:
+                    sheets_data.append(self._stream_worksheet(
+                        sheet.name, fh, shared_strings,
+                        date_styles, timedelta_styles, workbook.wb.epoch,
+                        formula_intern, type_codes,
+                    ))
+        
+        return sheets_data
+    
+    def _read_shared_strings(self, source: Any) -> List[str]:
+        """
+        Read the shared string table of a workbook as a list of strings.
+        
+        Rich text runs are joined and phonetic hints dropped, as openpyxl does.
+        """
+        strings: List[str] = []
+        append = strings.append
+        
+        # The table is taken from its start event so finished strings can be
+        # removed from it, keeping memory flat on large tables
+        table = None
+        if LXML_AVAILABLE:
+            events = iterparse(
+                source, events=("start", "end"), tag=(_SHARED_STRING_TABLE_TAG, _SHARED_STRING_TAG)
+            )
+        else:
+            events = iterparse(source, events=("start", "end"))
+        
+        for event, elem in events:
+            if event == "start":
+                if elem.tag == _SHARED_STRING_TABLE_TAG:
+                    table = elem
+                continue
+            if elem.tag != _SHARED_STRING_TAG:
+                continue
+            
+            text = elem.find(_TEXT_TAG)
+            if text is not None:
+                value = text.text or ""
+            else:
+                value = "".join(run.text or "" for run in elem.iterfind(_RICH_TEXT_PATH))
+            append(value.replace("x005F_", ""))
+            elem.clear()
+            if table is not None:
+                table.remove(elem)
+        
+        return strings
+    
+    def _stream_worksheet(
+        self,
+        sheet_name: str,
+        source: Any,
+        shared_strings: List[str],
+        date_styles: Set[int],
+        timedelta_styles: Set[int],
+        epoch: Any,
+        formula_intern: Dict[str, str],
+        type_codes: Dict[type, int],
+    ) -> Dict[str, Any]:
+        """
+        Build a columnar sheet from one worksheet XML stream.
+        
+        Values are converted the way openpyxl does: numbers become int or
+        float, date-formatted numbers become datetimes and shared formulas
+        are translated to each cell.
+        """
+        from openpyxl.cell.text import Text
+        from openpyxl.formula.translate import Translator
+        from openpyxl.utils.datetime import from_excel, from_ISO8601
+        
+        rows, cols, values, formulas, data_types = [], [], [], [], []
+        shared_formulas: Dict[str, Any] = {}
+        
+        # <sheetData> is taken from its start event so finished rows can be
+        # removed from it; clearing alone would leave every empty row attached
+        sheet_data = None
+        if LXML_AVAILABLE:
+            # lxml filters tags in C, so only cells and rows reach Python
+            events = iterparse(
+                source, events=("start", "end"), tag=(_SHEET_DATA_TAG, _CELL_TAG, _ROW_TAG)
+            )
+        else:
+            events = iterparse(source, events=("start", "end"))
+        
+        for event, elem in events:
+            if event == "start":
+                if elem.tag == _SHEET_DATA_TAG:
+                    sheet_data = elem
+                continue
+            
+            tag = elem.tag
+            if tag != _CELL_TAG:
+                # A finished row has been consumed; release it and its cells
+                if tag == _ROW_TAG:
+                    elem.clear()
+                    if sheet_data is not None:
+                        sheet_data.remove(elem)
+                continue
+            
+            # Cells without a reference are rare; openpyxl handles them
+            coordinate = elem.attrib["r"]
+            data_type = elem.get("t", "n")
+            formula = elem.find(_FORMULA_TAG)
+            raw = None if data_type == "inlineStr" else (elem.findtext(_VALUE_TAG) or None)
+            formula_str = None
+            
+            if formula is not None:
+                text = "=" + (formula.text or "")
+                formula_type = formula.get("t")
+                if formula_type == "shared":
+                    idx = formula.get("si")
+                    if idx in shared_formulas:
+                        text = shared_formulas[idx].translate_formula(coordinate)
+                    elif text != "=":
+                        shared_formulas[idx] = Translator(text, coordinate)
                 
-                for sheet_name in wb.sheet_names():
-                    ws = wb.sheet_by_name(sheet_name)
-                    cells = []
-                    
-                    for row_idx in range(ws.nrows):
-                        for col_idx in range(ws.ncols):
-                            cell = ws.cell(row_idx, col_idx)
-                            
-                            # Skip empty cells
-                            if cell.ctype == xlrd.XL_CELL_EMPTY:
-                                continue
-                            
-                            # Get cell value
-                            value = cell.value
-                            if cell.ctype == xlrd.XL_CELL_DATE:
-                                value = xlrd.xldate_as_datetime(cell.value, wb.datemode)
-                            
-                            cells.append({
-                                "row": row_idx,
-                                "col": self._col_num_to_letter(col_idx),
-                                "value": str(value) if value else "",
-                                "formula": None,  # xlrd doesn't support formulas
-                                "data_type": self._get_xlrd_type(cell.ctype),
-                            })
+                formula_str = formula_intern.get(text)
+                if formula_str is None:
+                    formula_str = sys.intern(text)
+                    formula_intern[text] = formula_str
+            
+            # Cell value, or the cached result of a formula
+            value = raw
+            if raw is not None:
+                if data_type == "n":
+                    if formula_str is not None:
+                        # Cached results keep whole numbers as int
+                        value = float(raw)
+                        if value.is_integer():
+                            value = int(value)
+                    elif "." in raw or "E" in raw or "e" in raw:
+                        value = float(raw)
+                    else:
+                        value = int(raw)
                     
-                    sheets_data.append({
-                        "name": sheet_name,
-                        "cells": cells,
-                        "row_count": ws.nrows,
-                        "col_count": ws.ncols,
-                    })
-                
-                return sheets_data
-                
-            except ImportError:
-                raise Exception(
-                    "xlrd library is required to read .xls files. "
-                    "Please install it with: pip install xlrd"
-                )
-        else:
-            # Use openpyxl for .xlsx, .xlsm files
-            import openpyxl
+                    style_id = int(elem.get("s", 0))
+                    if style_id in date_styles:
+                        try:
+                            value = from_excel(
+                                value, epoch, timedelta=style_id in timedelta_styles
+                            )
+                        except (OverflowError, ValueError):
+                            value = "#VALUE!"
+                elif data_type == "s":
+                    value = shared_strings[int(raw)]
+                elif data_type == "b":
+                    value = bool(int(raw))
+                elif data_type == "d":
+                    value = from_ISO8601(raw)
+            elif data_type == "inlineStr":
+                inline = elem.find(_INLINE_STRING_TAG)
+                if inline is not None:
+                    value = Text.from_tree(inline).content
+            
+            if formula_str is None and value is None:
+                continue
+            
+            letters = coordinate.rstrip("0123456789")
+            rows.append(int(coordinate[len(letters):]))
+            cols.append(letters)
+            if type(value) is int and _SMALL_INT_MIN <= value <= _SMALL_INT_MAX:
+                values.append(_SMALL_INT_STRINGS[value - _SMALL_INT_MIN])
+            else:
+                values.append(str(value) if value is not None else "")
+            formulas.append(formula_str)
+            
+            # Formula cells are typed by their formula string
+            value_type = str if formula_str is not None else type(value)
+            type_code = type_codes.get(value_type)
+            if type_code is None:
+                type_code = _DATA_TYPE_CODES.get(value_type.__name__, _OTHER_DATA_TYPE)
+                type_codes[value_type] = type_code
+            data_types.append(type_code)
+        
+        return _columnar_sheet(
+            sheet_name, rows, cols, values, formulas, data_types,
+            row_count=max(rows, default=0),
+            col_count=max(map(_COL_NUMBERS.__getitem__, set(cols)), default=0),
+        )
+    
+    def _read_xls(self, file_path: str) -> list:
+        """Read an old .xls workbook with xlrd (values only)."""
+        # Use xlrd for old .xls files
+        try:
+            import xlrd
             
-            # Load workbook twice: once for formulas, once for values
-            wb_formulas = openpyxl.load_workbook(file_path, data_only=False)
-            wb_values = openpyxl.load_workbook(file_path, data_only=True)
+            wb = xlrd.open_workbook(file_path)
             sheets_data = []
+            # Data type code of each xlrd cell type, resolved on first use
+            type_codes: Dict[int, int] = {}
             
-            for sheet_name in wb_formulas.sheetnames:
-                ws_formulas = wb_formulas[sheet_name]
-                ws_values = wb_values[sheet_name]
-                cells = []
+            for sheet_name in wb.sheet_names():
+                ws = wb.sheet_by_name(sheet_name)
+                rows, cols, values, formulas, data_types = [], [], [], [], []
                 
-                for row in ws_formulas.iter_rows():
-                    for cell in row:
-                        # Check if cell has content
-                        if cell.value is None:
+                # Stream the row lists instead of indexing every (row, col)
+                for row_idx, row in enumerate(ws.get_rows()):
+                    for col_idx, cell in enumerate(row):
+                        # Skip empty cells
+                        if cell.ctype == xlrd.XL_CELL_EMPTY:
                             continue
                         
-                        # Get corresponding value cell
-                        value_cell = ws_values.cell(row=cell.row, column=cell.column)
-                        
-                        # Determine if cell has a formula
-                        has_formula = cell.data_type == 'f'
-                        formula_str = None
-                        cell_value = None
+                        # Get cell value
+                        value = cell.value
+                        if cell.ctype == xlrd.XL_CELL_DATE:
+                            value = xlrd.xldate_as_datetime(cell.value, wb.datemode)
                         
-                        if has_formula:
-                            # For formula cells, cell.value contains the formula string
-                            formula_str = f"={cell.value}" if not str(cell.value).startswith('=') else str(cell.value)
-                            # Get calculated value from data_only workbook
-                            cell_value = value_cell.value
-                        else:
-                            # For non-formula cells, use the actual value
-                            cell_value = cell.value
-                        
-                        cells.append({
-                            "row": cell.row,  # Keep 1-indexed (Excel standard)
-                            "col": cell.column_letter,
-                            "value": str(cell_value) if cell_value is not None else "",
-                            "formula": formula_str,
-                            "data_type": str(type(cell.value).__name__),
-                        })
+                        rows.append(row_idx)
+                        cols.append(_COL_LETTERS[col_idx])
+                        values.append(str(value) if value else "")
+                        formulas.append(None)  # xlrd doesn't support formulas
+                        type_code = type_codes.get(cell.ctype)
+                        if type_code is None:
+                            type_code = _DATA_TYPE_CODES.get(self._get_xlrd_type(cell.ctype), _OTHER_DATA_TYPE)
+                            type_codes[cell.ctype] = type_code
+                        data_types.append(type_code)
                 
-                sheets_data.append({
-                    "name": sheet_name,
-                    "cells": cells,
-                    "row_count": ws_formulas.max_row,
-                    "col_count": ws_formulas.max_column,
-                })
+                sheets_data.append(_columnar_sheet(
+                    sheet_name, rows, cols, values, formulas, data_types,
+                    row_count=ws.nrows,
+                    col_count=ws.ncols,
+                ))
             
             return sheets_data
+            
+        except ImportError:
+            raise Exception(
+                "xlrd library is required to read .xls files. "
+                "Please install it with: pip install xlrd"
+            )
+    
+    def _load_values(self, file_path: str) -> Tuple[Optional[Dict[str, list]], Any]:
+        """
+        Load calculated cell values.
+        
+        Returns (cached_values, None) when python-calamine is available,
+        otherwise (None, workbook) with an openpyxl data_only workbook.
+        """
+        try:
+            return self._read_cached_values(file_path), None
+        except ImportError:
+            import openpyxl
+            return None, openpyxl.load_workbook(file_path, data_only=True)
+    
+    def _extract_cells(
+        self,
+        wb_formulas: Any,
+        cached_values: Optional[Dict[str, list]],
+        wb_values: Any
+    ) -> list:
+        """Build sheet dictionaries from the formulas workbook and its values."""
+        sheets_data = []
+        # Formulas are often filled down a column, so the normalized strings
+        # and type codes are memoized and shared across all cells
+        formula_intern: Dict[str, str] = {}
+        type_codes: Dict[type, int] = {}
+        
+        for sheet_name in wb_formulas.sheetnames:
+            ws_formulas = wb_formulas[sheet_name]
+            if cached_values is not None:
+                sheet_values = cached_values.get(sheet_name, [])
+            else:
+                ws_values = wb_values[sheet_name]
+            rows, cols, values, formulas, data_types = [], [], [], [], []
+            # Sheet dimensions are tracked while streaming; read-only sheets
+            # only know them if the file records them
+            max_row = 0
+            max_col = 0
+            
+            for row in ws_formulas.iter_rows():
+                for cell in row:
+                    # Check if cell has content
+                    if cell.value is None:
+                        continue
+                    
+                    if cell.row > max_row:
+                        max_row = cell.row
+                    if cell.column > max_col:
+                        max_col = cell.column
+                    
+                    # Determine if cell has a formula
+                    has_formula = cell.data_type == 'f'
+                    formula_str = None
+                    cell_value = None
+                    
+                    if has_formula:
+                        # For formula cells, cell.value contains the formula string
+                        raw = cell.value if isinstance(cell.value, str) else str(cell.value)
+                        formula_str = formula_intern.get(raw)
+                        if formula_str is None:
+                            formula_str = sys.intern(raw if raw.startswith('=') else f"={raw}")
+                            formula_intern[raw] = formula_str
+                        # Get calculated value from the values workbook
+                        if cached_values is not None:
+                            cell_value = self._lookup_cached_value(sheet_values, cell.row, cell.column)
+                        else:
+                            cell_value = ws_values.cell(row=cell.row, column=cell.column).value
+                    else:
+                        # For non-formula cells, use the actual value
+                        cell_value = cell.value
+                    
+                    rows.append(cell.row)  # Keep 1-indexed (Excel standard)
+                    cols.append(_COL_LETTERS[cell.column - 1])
+                    if type(cell_value) is int and _SMALL_INT_MIN <= cell_value <= _SMALL_INT_MAX:
+                        values.append(_SMALL_INT_STRINGS[cell_value - _SMALL_INT_MIN])
+                    else:
+                        values.append(str(cell_value) if cell_value is not None else "")
+                    formulas.append(formula_str)
+                    value_type = type(cell.value)
+                    type_code = type_codes.get(value_type)
+                    if type_code is None:
+                        type_code = _DATA_TYPE_CODES.get(value_type.__name__, _OTHER_DATA_TYPE)
+                        type_codes[value_type] = type_code
+                    data_types.append(type_code)
+            
+            sheets_data.append(_columnar_sheet(
+                sheet_name, rows, cols, values, formulas, data_types,
+                row_count=max_row,
+                col_count=max_col,
+            ))
+        
+        return sheets_data
+    
+    def _read_cached_values(self, file_path: str) -> Dict[str, list]:
+        """
+        Read calculated cell values with python-calamine.
+        
+        Returns a mapping of sheet name to a list of rows, where row 0 is
+        Excel row 1. Raises ImportError if python-calamine is not installed.
+        """
+        from python_calamine import CalamineWorkbook
+        
+        wb = CalamineWorkbook.from_path(file_path)
+        return {
+            name: wb.get_sheet_by_name(name).to_python(skip_empty_area=False)
+            for name in wb.sheet_names
+        }
+    
+    def _lookup_cached_value(self, sheet_values: list, row: int, column: int) -> Any:
+        """Get a calamine value by 1-indexed position, normalized like openpyxl."""
+        try:
+            value = sheet_values[row - 1][column - 1]
+        except IndexError:
+            return None
+        
+        if value == "":
+            return None
+        # calamine reports every number as float; openpyxl keeps whole numbers as int
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value
     
     def _get_xlrd_type(self, ctype: int) -> str:
         """Convert xlrd cell type to string."""
@@ -293,13 +755,9 @@ class AnalysisService:
     
     def _col_num_to_letter(self, col_num: int) -> str:
         """Convert column number to letter (0 -> A, 25 -> Z, 26 -> AA)."""
-        result = ""
-        while col_num >= 0:
-            result = chr(col_num % 26 + 65) + result
-            col_num = col_num // 26 - 1
-            if col_num < 0:
-                break
-        return result
+        if 0 <= col_num < len(_COL_LETTERS):
+            return _COL_LETTERS[col_num]
+        return _column_letter(col_num)
 
 
 # Create singleton instance
@@ -0,0 +1,294 @@
+"""
+Job Store - Persists analysis job state.
+
+Two backends are available, selected with ``settings.JOB_STORE``:
+- ``memory``: a process-local dict (single worker, lost on restart)
+- ``redis``: Redis hashes keyed ``job:{id}`` with a TTL, plus a
+  ``jobs:pending`` queue consumed by ``app.worker``
+"""
+
+import asyncio
+import time
+import orjson
+import zstandard
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from ..utils import settings, get_logger
+
+logger = get_logger(__name__)
+
+
+class JobStore(ABC):
+    """
+    Interface for analysis job storage.
+
+    Stores with ``uses_queue`` set also dispatch jobs to workers through
+    enqueue/claim/ack; the others run jobs in the API process and leave
+    the queue methods unimplemented.
+    """
+
+    # True if jobs are dispatched through a queue to a separate worker
+    uses_queue: bool = False
+
+    @abstractmethod
+    async def create(self, job_id: str, record: Dict[str, Any]) -> None:
+        """Create a new job record."""
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job record, or None if it does not exist."""
+
+    @abstractmethod
+    async def update(self, job_id: str, **fields: Any) -> None:
+        """Update fields of an existing job record."""
+
+    @abstractmethod
+    async def exists(self, job_id: str) -> bool:
+        """Check whether a job exists."""
+
+    async def enqueue(self, job_id: str) -> None:
+        """Queue a job for processing by a worker."""
+        raise NotImplementedError(f"{type(self).__name__} does not queue jobs")
+
+    async def claim(self, timeout: int = 0) -> Optional[str]:
+        """Wait up to timeout seconds (0 = forever) for a queued job and claim it."""
+        raise NotImplementedError(f"{type(self).__name__} does not queue jobs")
+
+    async def touch(self, job_id: str) -> None:
+        """Renew the claim on a job that is still being processed."""
+        raise NotImplementedError(f"{type(self).__name__} does not queue jobs")
+
+    async def ack(self, job_id: str) -> None:
+        """Release the claim on a finished job."""
+        raise NotImplementedError(f"{type(self).__name__} does not queue jobs")
+
+    async def requeue_stale(self, visibility_timeout: int) -> int:
+        """Requeue claimed jobs not renewed within the timeout; returns the number requeued."""
+        return 0
+
+    async def purge_expired(self) -> int:
+        """Remove finished jobs older than the TTL; returns the number removed."""
+        return 0
+
+    async def close(self) -> None:
+        """Release any resources held by the store."""
+
+
+class InMemoryJobStore(JobStore):
+    """
+    Job store backed by a process-local dictionary.
+
+    Finished jobs are dropped by purge_expired once they are older than the
+    TTL, so memory use does not grow with uptime.
+    """
+
+    def __init__(self, ttl: int = 86400):
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.ttl = ttl
+
+    async def create(self, job_id: str, record: Dict[str, Any]) -> None:
+        self.jobs[job_id] = dict(record)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.jobs.get(job_id)
+
+    async def update(self, job_id: str, **fields: Any) -> None:
+        if job_id in self.jobs:
+            self.jobs[job_id].update(fields)
+
+    async def exists(self, job_id: str) -> bool:
+        return job_id in self.jobs
+
+    async def purge_expired(self) -> int:
+        cutoff = datetime.now() - timedelta(seconds=self.ttl)
+        expired = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job["status"] in ("completed", "failed")
+            and (job.get("completed_at") or job["created_at"]) < cutoff
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+        return len(expired)
+
+
+class RedisJobStore(JobStore):
+    """
+    Job store backed by Redis hashes.
+
+    Each job lives in a hash keyed ``job:{id}`` whose fields are JSON-encoded
+    with orjson and which expires after ``settings.JOB_TTL`` seconds. The
+    large ``result`` payload is additionally zstd-compressed. Jobs are dispatched
+    by pushing their ID onto ``jobs:pending``; workers claim them with
+    BRPOPLPUSH into ``jobs:processing`` and remove them once finished.
+
+    The time of each claim is kept in the ``jobs:claimed`` sorted set and
+    renewed by the worker while it runs the job. Jobs whose claim is older
+    than the visibility timeout belong to a worker that died, and are moved
+    back to ``jobs:pending`` by requeue_stale.
+    """
+
+    uses_queue = True
+
+    KEY_PREFIX = "job:"
+    PENDING_QUEUE = "jobs:pending"
+    PROCESSING_QUEUE = "jobs:processing"
+    CLAIMED_AT = "jobs:claimed"
+    
+    # Fields stored zstd-compressed
+    COMPRESSED_FIELDS = frozenset({"result"})
+    COMPRESSION_LEVEL = 3
+
+    def __init__(self, ttl: int = 86400):
+        import redis.asyncio as aioredis
+
+        self.redis = aioredis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+        )
+        self.ttl = ttl
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.KEY_PREFIX}{job_id}"
+
+    def _encode(self, fields: Dict[str, Any]) -> Dict[str, bytes]:
+        encoded = {}
+        for name, value in fields.items():
+            payload = orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+            if name in self.COMPRESSED_FIELDS:
+                payload = zstandard.ZstdCompressor(level=self.COMPRESSION_LEVEL).compress(payload)
+            encoded[name] = payload
+        return encoded
+
+    def _decode(self, raw: Dict[bytes, bytes]) -> Dict[str, Any]:
+        decoded = {}
+        for name, payload in raw.items():
+            name = name.decode()
+            if name in self.COMPRESSED_FIELDS:
+                payload = zstandard.ZstdDecompressor().decompress(payload)
+            decoded[name] = orjson.loads(payload)
+        return decoded
+
+    async def create(self, job_id: str, record: Dict[str, Any]) -> None:
+        key = self._key(job_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=self._encode(record))
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.redis.hgetall(self._key(job_id))
+        if not raw:
+            return None
+        return self._decode(raw)
+
+    async def update(self, job_id: str, **fields: Any) -> None:
+        if not fields:
+            return
+        await self.redis.hset(self._key(job_id), mapping=self._encode(fields))
+
+    async def exists(self, job_id: str) -> bool:
+        return bool(await self.redis.exists(self._key(job_id)))
+
+    async def enqueue(self, job_id: str) -> None:
+        """Queue a job for processing by a worker."""
+        await self.redis.rpush(self.PENDING_QUEUE, job_id)
+
+    async def claim(self, timeout: int = 0) -> Optional[str]:
+        """Block until a pending job is available and move it to processing."""
+        job_id = await self.redis.brpoplpush(
+            self.PENDING_QUEUE, self.PROCESSING_QUEUE, timeout
+        )
+        if job_id is None:
+            return None
+        job_id = job_id.decode()
+        await self.touch(job_id)
+        return job_id
+
+    async def touch(self, job_id: str) -> None:
+        """Record that a claimed job is still being processed."""
+        await self.redis.zadd(self.CLAIMED_AT, {job_id: time.time()})
+
+    async def ack(self, job_id: str) -> None:
+        """Remove a finished job from the processing list."""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(self.PROCESSING_QUEUE, 0, job_id)
+            pipe.zrem(self.CLAIMED_AT, job_id)
+            await pipe.execute()
+
+    async def requeue_stale(self, visibility_timeout: int) -> int:
+        """Move jobs whose claim expired from processing back to pending."""
+        from redis.exceptions import WatchError
+
+        processing = await self.redis.lrange(self.PROCESSING_QUEUE, 0, -1)
+        if not processing:
+            return 0
+
+        requeued = 0
+        cutoff = time.time() - visibility_timeout
+        for job_id in set(processing):
+            async with self.redis.pipeline(transaction=True) as pipe:
+                try:
+                    # A concurrent touch or ack aborts the move
+                    await pipe.watch(self.CLAIMED_AT)
+                    claimed_at = await pipe.zscore(self.CLAIMED_AT, job_id)
+                    if claimed_at is None:
+                        # The worker stopped before recording its claim;
+                        # start the clock now so the job expires like the others
+                        pipe.multi()
+                        pipe.zadd(self.CLAIMED_AT, {job_id: time.time()}, nx=True)
+                        await pipe.execute()
+                        continue
+                    if claimed_at > cutoff:
+                        continue
+
+                    pipe.multi()
+                    pipe.lrem(self.PROCESSING_QUEUE, 0, job_id)
+                    pipe.zrem(self.CLAIMED_AT, job_id)
+                    pipe.rpush(self.PENDING_QUEUE, job_id)
+                    await pipe.execute()
+                    requeued += 1
+                except WatchError:
+                    continue
+
+        return requeued
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+def create_job_store() -> JobStore:
+    """Create the job store configured by ``settings.JOB_STORE``."""
+    if settings.JOB_STORE == "redis":
+        logger.info("Using Redis job store", host=settings.REDIS_HOST)
+        return RedisJobStore(ttl=settings.JOB_TTL)
+    return InMemoryJobStore(ttl=settings.JOB_TTL)
+
+
+# Create singleton instance
+job_store = create_job_store()
+
+
+def get_job_store() -> JobStore:
+    """FastAPI dependency returning the configured job store."""
+    return job_store
+
+
+async def requeue_stale_jobs(interval: int, visibility_timeout: int) -> None:
+    """Requeue jobs of dead workers now and then periodically."""
+    while True:
+        requeued = await job_store.requeue_stale(visibility_timeout)
+        if requeued:
+            logger.warning("Requeued stale jobs", count=requeued)
+        await asyncio.sleep(interval)
+
+
+async def reap_expired_jobs(interval: int) -> None:
+    """Periodically purge expired jobs from the job store."""
+    while True:
+        await asyncio.sleep(interval)
+        removed = await job_store.purge_expired()
+        if removed:
+            logger.info("Purged expired jobs", count=removed)
@@ -0,0 +1,106 @@
+"""
+Result Cache - Reuses analysis results of identical workbooks.
+
+Results are stored in Redis under ``analysis:{version}:{sha256}:{options}``,
+where the digest is taken over the uploaded file's contents, as
+zstd-compressed orjson that expires after ``settings.CACHE_TTL`` seconds.
+The app version in the key keeps results of older releases from being reused.
+Enabled with ``settings.ENABLE_CACHE`` when ``settings.JOB_STORE`` is redis;
+Redis errors are logged and treated as a miss so analysis never depends on
+the cache being reachable.
+"""
+
+import hashlib
+import orjson
+import zstandard
+from typing import Any, Dict, Optional
+from ..utils import settings, get_logger
+
+logger = get_logger(__name__)
+
+
+class ResultCache:
+    """Redis cache of analysis results keyed by file content hash."""
+
+    KEY_PREFIX = "analysis:"
+    COMPRESSION_LEVEL = 3
+
+    def __init__(self, ttl: int = 3600):
+        self.ttl = ttl
+        self.logger = logger.bind(component="ResultCache")
+        self._redis = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether results are cached; only with the Redis job store."""
+        return settings.ENABLE_CACHE and settings.JOB_STORE == "redis"
+    
+    @property
+    def redis(self):
+        """Redis client, created on first use."""
+        if self._redis is None:
+            import redis.asyncio as aioredis
+
+            self._redis = aioredis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=settings.REDIS_DB,
+            )
+        return self._redis
+
+    def make_key(
+        self,
+        file_path: str,
+        include_values: bool,
+        detect_anomalies: bool,
+        identify_cost_drivers: bool,
+        top_drivers_count: int,
+    ) -> str:
+        """
+        Build the cache key of a file and its analysis options.
+
+        Reads and hashes the whole file, so call it off the event loop.
+        """
+        with open(file_path, "rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+        return (
+            f"{self.KEY_PREFIX}{settings.APP_VERSION}:{digest}"
+            f":{include_values}:{detect_anomalies}"
+            f":{identify_cost_drivers}:{top_drivers_count}"
+        )
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached result, or None on a miss or Redis error."""
+        from redis.exceptions import RedisError
+
+        try:
+            payload = await self.redis.get(key)
+        except (RedisError, OSError) as e:
+            self.logger.warning("Result cache unavailable", error=str(e))
+            return None
+
+        if payload is None:
+            return None
+        return orjson.loads(zstandard.ZstdDecompressor().decompress(payload))
+
+    async def set(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a result with the cache TTL; Redis errors are logged."""
+        from redis.exceptions import RedisError
+
+        payload = zstandard.ZstdCompressor(level=self.COMPRESSION_LEVEL).compress(
+            orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS)
+        )
+        try:
+            await self.redis.setex(key, self.ttl, payload)
+        except (RedisError, OSError) as e:
+            self.logger.warning("Result cache unavailable", error=str(e))
+
+    async def close(self) -> None:
+        """Release the Redis connection, if one was opened."""
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+# Create singleton instance
+result_cache = ResultCache(ttl=settings.CACHE_TTL)
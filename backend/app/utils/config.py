@@ -3,8 +3,7 @@ Configuration management for Formula Intelligence backend.
 Loads settings from environment variables with sensible defaults.
 """
 
-from pydantic_settings import BaseSettings
-from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 
 
@@ -23,12 +22,21 @@ class Settings(BaseSettings):
     # File Upload
     MAX_FILE_SIZE_MB: int = 100
     UPLOAD_DIR: str = "./uploads"
-    ALLOWED_EXTENSIONS: set[str] = {".xlsx", ".xlsm", ".xls"}
+    ALLOWED_EXTENSIONS: frozenset[str] = frozenset({".xlsx", ".xlsm", ".xls"})
     
     # Processing
     MAX_WORKERS: int = 8
     ENABLE_MULTIPROCESSING: bool = True
     CHUNK_SIZE: int = 10000
+    # Opt-in until the Rust reader matches the Python readers (test_rust_reader.py)
+    USE_RUST_READER: bool = False  # falls back to Python readers if not installed or on error
+    MAX_CONCURRENT_ANALYSES: int = 4
+    
+    # Jobs
+    JOB_STORE: str = "memory"  # memory or redis (redis requires app.worker)
+    JOB_TTL: int = 86400  # 24 hours
+    JOB_REAP_INTERVAL: int = 60  # seconds between expired job sweeps
+    JOB_VISIBILITY_TIMEOUT: int = 300  # seconds a worker may go without renewing its claim
     
     # Graph Settings
     MAX_NODES_RENDER: int = 10000
@@ -40,7 +48,7 @@ class Settings(BaseSettings):
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
     CACHE_TTL: int = 3600  # 1 hour
-    ENABLE_CACHE: bool = True
+    ENABLE_CACHE: bool = True  # only takes effect with JOB_STORE=redis
     
     # Database (for future use)
     DATABASE_URL: Optional[str] = None
@@ -58,19 +66,18 @@ class Settings(BaseSettings):
     ENABLE_PROFILING: bool = False
     BENCHMARK_MODE: bool = False
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    # Settings are read once at import and never change for the process
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=True,
+        frozen=True,
+    )
 
 
-@lru_cache()
-def get_settings() -> Settings:
-    """
-    Get cached settings instance.
-    Uses lru_cache to ensure settings are loaded only once.
-    """
-    return Settings()
+# Export settings instance
+settings = Settings()
 
 
-# Export settings instance
-settings = get_settings()
+def get_settings() -> Settings:
+    """Get the settings instance loaded at import."""
+    return settings
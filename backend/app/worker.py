@@ -0,0 +1,70 @@
+"""
+Analysis worker for Formula Intelligence.
+
+Consumes queued analysis jobs from Redis when ``JOB_STORE=redis``.
+Run with: python -m app.worker
+"""
+
+import asyncio
+
+from .utils import settings, get_logger, setup_logging
+from .services import job_store, result_cache, requeue_stale_jobs
+from .api.routes import process_analysis
+from .core import shutdown_parse_executor
+
+# Setup logging
+setup_logging()
+logger = get_logger(__name__)
+
+
+async def keep_claim(job_id: str) -> None:
+    """Renew the claim on a job while it is processed, so it is not requeued."""
+    while True:
+        await asyncio.sleep(settings.JOB_VISIBILITY_TIMEOUT / 3)
+        await job_store.touch(job_id)
+
+
+async def run_worker() -> None:
+    """Claim queued jobs one at a time and run their analysis."""
+    if not job_store.uses_queue:
+        raise RuntimeError("The analysis worker requires JOB_STORE=redis")
+    
+    logger.info("Analysis worker started")
+    
+    # Jobs left claimed by workers that died go back to the queue once their
+    # claim expires; the first sweep runs at startup
+    requeuer = asyncio.create_task(
+        requeue_stale_jobs(settings.JOB_REAP_INTERVAL, settings.JOB_VISIBILITY_TIMEOUT)
+    )
+    
+    try:
+        while True:
+            job_id = await job_store.claim()
+            if job_id is None:
+                continue
+            
+            keepalive = asyncio.create_task(keep_claim(job_id))
+            try:
+                job = await job_store.get(job_id)
+                if job is None:
+                    logger.warning("Queued job not found", job_id=job_id)
+                    continue
+                
+                await process_analysis(
+                    job_store=job_store,
+                    job_id=job_id,
+                    file_path=job["file_path"],
+                    **job["params"],
+                )
+            finally:
+                keepalive.cancel()
+                await job_store.ack(job_id)
+    finally:
+        requeuer.cancel()
+        await job_store.close()
+        await result_cache.close()
+        await asyncio.to_thread(shutdown_parse_executor)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
@@ -2,13 +2,16 @@ use pyo3::prelude::*;
 use pyo3::types::PyDict;
 use calamine::{Reader, open_workbook, Xlsx, Data, Range};
 use rayon::prelude::*;
+use std::collections::HashMap;
 
 /// Represents a cell with its value and formula
 #[pyclass]
 #[derive(Clone)]
 struct Cell {
+    /// Excel row number (1-indexed)
     #[pyo3(get)]
     row: u32,
+    /// Column index (0-indexed, 0 = A)
     #[pyo3(get)]
     col: u32,
     #[pyo3(get)]
@@ -91,21 +94,35 @@ impl ExcelReader {
     }
 
     /// Parse the entire workbook
-    fn parse(&mut self) -> PyResult<()> {
+    ///
+    /// Formulas are read from each sheet's formula records and attached to
+    /// the cached values; pass include_formulas=False to read values only.
+    #[pyo3(signature = (include_formulas=true))]
+    fn parse(&mut self, include_formulas: bool) -> PyResult<()> {
         let mut workbook: Xlsx<_> = open_workbook(&self.path)
             .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(format!("Failed to open workbook: {}", e)))?;
 
         let sheet_names: Vec<String> = workbook.sheet_names().to_vec();
 
-        // Parse sheets in parallel for better performance
+        // Parse sheets in parallel for better performance; any failing sheet
+        // fails the whole parse so the caller can fall back to another reader
         let sheets: Vec<Sheet> = sheet_names
             .par_iter()
-            .filter_map(|name| {
-                let mut wb: Xlsx<_> = open_workbook(&self.path).ok()?;
-                let range = wb.worksheet_range(name).ok()?;
-                Some(Self::parse_sheet(name.clone(), range))
+            .map(|name| -> Result<Sheet, String> {
+                let mut wb: Xlsx<_> = open_workbook(&self.path)
+                    .map_err(|e| format!("Failed to open workbook: {}", e))?;
+                let values = wb.worksheet_range(name)
+                    .map_err(|e| format!("Failed to read sheet '{}': {}", name, e))?;
+                let formulas = if include_formulas {
+                    Some(wb.worksheet_formula(name)
+                        .map_err(|e| format!("Failed to read formulas of sheet '{}': {}", name, e))?)
+                } else {
+                    None
+                };
+                Ok(Self::parse_sheet(name.clone(), values, formulas))
             })
-            .collect();
+            .collect::<Result<Vec<_>, _>>()
+            .map_err(PyErr::new::<pyo3::exceptions::PyIOError, _>)?;
 
         self.sheets = sheets;
         Ok(())
@@ -146,64 +163,104 @@ impl ExcelReader {
 }
 
 impl ExcelReader {
-    /// Parse a single sheet range into a Sheet struct
-    fn parse_sheet(name: String, range: Range<Data>) -> Sheet {
-        let (row_count, col_count) = range.get_size();
+    /// Parse a sheet's value range and formula range into a Sheet struct
+    fn parse_sheet(name: String, values: Range<Data>, formulas: Option<Range<String>>) -> Sheet {
+        let mut row_count = 0;
+        let mut col_count = 0;
+
+        // Formulas keyed by absolute (row, col); the ranges may start at
+        // different cells, so relative positions cannot be compared
+        let mut formula_map: HashMap<(u32, u32), String> = HashMap::new();
+        if let Some(range) = &formulas {
+            if let (Some((row0, col0)), Some((row1, col1))) = (range.start(), range.end()) {
+                row_count = row1 + 1;
+                col_count = col1 + 1;
+                for (row_idx, col_idx, formula) in range.used_cells() {
+                    formula_map.insert(
+                        (row0 + row_idx as u32, col0 + col_idx as u32),
+                        Self::normalize_formula(formula),
+                    );
+                }
+            }
+        }
+
         let mut cells = Vec::new();
 
-        for (row_idx, row) in range.rows().enumerate() {
-            for (col_idx, cell) in row.iter().enumerate() {
-                let cell_value = Self::datatype_to_string(cell);
-                
-                // Check if cell contains a formula
-                let formula = if cell_value.starts_with('=') {
-                    Some(cell_value.clone())
-                } else {
-                    None
-                };
+        if let (Some((row0, col0)), Some((row1, col1))) = (values.start(), values.end()) {
+            row_count = row_count.max(row1 + 1);
+            col_count = col_count.max(col1 + 1);
 
-                let data_type = match cell {
-                    Data::Int(_) => "int",
-                    Data::Float(_) => "float",
-                    Data::String(_) => "string",
-                    Data::Bool(_) => "bool",
-                    Data::DateTime(_) => "datetime",
-                    Data::DateTimeIso(_) => "datetime_iso",
-                    Data::DurationIso(_) => "duration_iso",
-                    Data::Error(_) => "error",
-                    Data::Empty => "empty",
-                };
+            for (row_idx, col_idx, cell) in values.used_cells() {
+                let row = row0 + row_idx as u32;
+                let col = col0 + col_idx as u32;
+                let formula = formula_map.remove(&(row, col));
+                let (value, data_type) = Self::convert_value(cell);
 
                 cells.push(Cell {
-                    row: row_idx as u32,
-                    col: col_idx as u32,
-                    value: cell_value,
+                    row: row + 1,
+                    col,
+                    value,
+                    // Formula cells are typed by their formula string
+                    data_type: if formula.is_some() { "str" } else { data_type }.to_string(),
                     formula,
-                    data_type: data_type.to_string(),
                 });
             }
         }
 
+        // Formulas without a cached result
+        for ((row, col), formula) in formula_map {
+            cells.push(Cell {
+                row: row + 1,
+                col,
+                value: String::new(),
+                formula: Some(formula),
+                data_type: "str".to_string(),
+            });
+        }
+
+        cells.sort_unstable_by_key(|c| (c.row, c.col));
+
         Sheet {
             name,
             cells,
-            row_count: row_count as u32,
-            col_count: col_count as u32,
+            row_count,
+            col_count,
+        }
+    }
+
+    /// Prefix a formula with '=' as stored in the cell text
+    fn normalize_formula(formula: &str) -> String {
+        if formula.starts_with('=') {
+            formula.to_string()
+        } else {
+            format!("={}", formula)
         }
     }
 
-    /// Convert Data to String
-    fn datatype_to_string(cell: &Data) -> String {
+    /// Convert Data to its string value and data type name
+    ///
+    /// Strings and type names match the openpyxl reader: whole numbers are
+    /// ints and booleans are "True"/"False".
+    fn convert_value(cell: &Data) -> (String, &'static str) {
         match cell {
-            Data::Int(i) => i.to_string(),
-            Data::Float(f) => f.to_string(),
-            Data::String(s) => s.clone(),
-            Data::Bool(b) => b.to_string(),
-            Data::DateTime(dt) => format!("{:?}", dt),
-            Data::DateTimeIso(dt) => dt.clone(),
-            Data::DurationIso(d) => d.clone(),
-            Data::Error(e) => format!("#{:?}", e),
-            Data::Empty => String::new(),
+            Data::Int(i) => (i.to_string(), "int"),
+            Data::Float(f) => {
+                if f.fract() == 0.0 && f.abs() < 1e15 {
+                    ((*f as i64).to_string(), "int")
+                } else {
+                    (f.to_string(), "float")
+                }
+            }
+            Data::String(s) => (s.clone(), "str"),
+            Data::Bool(b) => ((if *b { "True" } else { "False" }).to_string(), "bool"),
+            Data::DateTime(dt) => match dt.as_datetime() {
+                Some(datetime) => (datetime.to_string(), "datetime"),
+                None => (dt.as_f64().to_string(), "float"),
+            },
+            Data::DateTimeIso(dt) => (dt.clone(), "datetime"),
+            Data::DurationIso(d) => (d.clone(), "timedelta"),
+            Data::Error(e) => (e.to_string(), "str"),
+            Data::Empty => (String::new(), "empty"),
         }
     }
 }
@@ -224,13 +281,26 @@ mod tests {
     #[test]
     fn test_cell_creation() {
         let cell = Cell {
-            row: 0,
+            row: 1,
             col: 0,
             value: "100".to_string(),
             formula: Some("=A1+B1".to_string()),
             data_type: "int".to_string(),
         };
-        assert_eq!(cell.row, 0);
+        assert_eq!(cell.row, 1);
         assert_eq!(cell.col, 0);
     }
+
+    #[test]
+    fn test_normalize_formula() {
+        assert_eq!(ExcelReader::normalize_formula("A1+B1"), "=A1+B1");
+        assert_eq!(ExcelReader::normalize_formula("=A1+B1"), "=A1+B1");
+    }
+
+    #[test]
+    fn test_convert_value() {
+        assert_eq!(ExcelReader::convert_value(&Data::Float(3.0)), ("3".to_string(), "int"));
+        assert_eq!(ExcelReader::convert_value(&Data::Float(2.5)), ("2.5".to_string(), "float"));
+        assert_eq!(ExcelReader::convert_value(&Data::Bool(true)), ("True".to_string(), "bool"));
+    }
 }
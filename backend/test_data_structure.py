@@ -1,50 +1,30 @@
-import openpyxl
-import json
+import asyncio
+import orjson
+from pathlib import Path
+from app.services.analysis_service import analysis_service, CELL_DATA_TYPES
 
-wb = openpyxl.load_workbook('test_files/simple_budget.xlsx', data_only=False)
-ws = wb.active
+async def main():
+    # Read the workbook exactly as the analysis pipeline does
+    sheets_data = await analysis_service._read_excel('test_files/simple_budget.xlsx')
 
-# Simulate what our code does
-cells = []
+    for sheet in sheets_data:
+        formula_count = sum(1 for formula in sheet['formulas'] if formula)
+        print(f"Sheet: {sheet['name']} ({sheet['row_count']} rows x {sheet['col_count']} cols)")
+        print(f"Total cells: {len(sheet['rows'])}")
+        print(f"Cells with formulas: {formula_count}")
+        print("\nFormula cells:")
+        for row, col, formula, code in zip(
+            sheet['rows'].tolist(), sheet['cols'], sheet['formulas'], sheet['data_types'].tolist()
+        ):
+            if formula:
+                print(f"  {col}{row}: {formula} ({CELL_DATA_TYPES[code]})")
 
-for row in ws.iter_rows():
-    for cell in row:
-        # Check if cell has content
-        if cell.value is None:
-            continue
-        
-        # Determine if cell has a formula
-        has_formula = cell.data_type == 'f'
-        formula_str = None
-        
-        if has_formula:
-            # For formula cells, the value is the formula
-            formula_str = f"={cell.value}" if not str(cell.value).startswith('=') else str(cell.value)
-        
-        cells.append({
-            "row": cell.row,  # Keep 1-indexed
-            "col": cell.column_letter,
-            "value": str(cell.value) if cell.value else "",
-            "formula": formula_str,
-            "data_type": str(type(cell.value).__name__),
-        })
+    # Save to JSON for inspection; rows and data_types are numpy arrays
+    Path('test_sheets_data.json').write_bytes(
+        orjson.dumps(sheets_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    )
 
-sheets_data = [{
-    "name": ws.title,
-    "cells": cells,
-    "row_count": ws.max_row,
-    "col_count": ws.max_column,
-}]
+    print("\nSaved to test_sheets_data.json")
 
-print(f"Total cells: {len(cells)}")
-print(f"Cells with formulas: {sum(1 for c in cells if c['formula'])}")
-print("\nFormula cells:")
-for cell in cells:
-    if cell['formula']:
-        print(f"  {cell['col']}{cell['row']}: {cell['formula']}")
-
-# Save to JSON for inspection
-with open('test_sheets_data.json', 'w') as f:
-    json.dump(sheets_data, f, indent=2)
-
-print("\nSaved to test_sheets_data.json")
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+import random
+import sys
+import tracemalloc
+import networkx as nx
+import numpy as np
+from app.core import CostDriverAnalyzer, DAGBuilder
+
+# Peak memory allowed for counting descendants. A bitset per cell spanning
+# the whole graph peaks around 750 MB on a 60k cell chain and 220 MB on a
+# 20k row C=A*B sheet totalled by D=SUM(C:C); chunked bitsets stay bounded.
+CHAIN_LENGTH = 60000
+WIDE_ROWS = 20000
+MAX_PEAK_MB = 150
+
+
+def build(cells):
+    """Build the graph of one sheet from {(col, row): formula or None}."""
+    sheet = {
+        'name': 'Sheet1',
+        'rows': np.array([row for _, row in cells], dtype=np.int32),
+        'cols': [col for col, _ in cells],
+        'values': [None] * len(cells),
+        'formulas': list(cells.values()),
+    }
+    builder = DAGBuilder()
+    builder.build([sheet])
+    return builder
+
+
+def check_against_networkx():
+    """Descendant counts must match nx.descendants, including cycles."""
+    rnd = random.Random(7)
+    for seed in range(20):
+        graph = nx.gnp_random_graph(150, 0.02, seed=seed, directed=True)
+        # Mostly acyclic, with a few back edges forming cycles
+        graph = nx.DiGraph(
+            (u, v) for u, v in graph.edges() if u < v or rnd.random() < 0.05
+        )
+        graph.add_nodes_from(range(150))
+
+        # Cell A{i+1} holds node i; its formula references its predecessors
+        cells = {}
+        for node_id in range(150):
+            refs = [f"A{u + 1}" for u in graph.predecessors(node_id)]
+            cells[('A', node_id + 1)] = "=" + "+".join(refs) if refs else None
+        builder = build(cells)
+
+        counts = CostDriverAnalyzer(builder)._compute_descendant_counts()
+        for node_id in graph.nodes():
+            expected = len(nx.descendants(graph, node_id))
+            got = counts[builder.node_id(f"Sheet1!A{node_id + 1}")]
+            assert got == expected, (seed, node_id, got, expected)
+    print("Descendant counts match networkx")
+
+
+def check_chain_memory():
+    """Peak memory on a long chain must stay well below O(n^2)."""
+    cells = {('A', 1): None}
+    for row in range(2, CHAIN_LENGTH + 1):
+        cells[('A', row)] = f"=A{row - 1}"
+    analyzer = CostDriverAnalyzer(build(cells))
+
+    tracemalloc.start()
+    counts = analyzer._compute_descendant_counts()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    peak_mb = peak / (1024 * 1024)
+    print(f"Chain of {CHAIN_LENGTH} cells: peak {peak_mb:.1f} MB")
+    assert counts[analyzer.builder.node_id("Sheet1!A1")] == CHAIN_LENGTH - 1
+    assert counts[analyzer.builder.node_id(f"Sheet1!A{CHAIN_LENGTH}")] == 0
+    assert peak_mb < MAX_PEAK_MB, f"peak {peak_mb:.1f} MB exceeds {MAX_PEAK_MB} MB"
+
+
+def check_wide_memory():
+    """Peak memory on a wide fan-in/fan-out sheet must stay bounded."""
+    # C_i = A_i * B_i with B_i = E1 * 2 for every row, and D1 totals column C
+    # (spelled out, as a range only references its two corners)
+    cells = {('E', 1): None}
+    for row in range(1, WIDE_ROWS + 1):
+        cells[('A', row)] = None
+        cells[('B', row)] = "=E1*2"
+        cells[('C', row)] = f"=A{row}*B{row}"
+    cells[('D', 1)] = "=" + "+".join(f"C{row}" for row in range(1, WIDE_ROWS + 1))
+    analyzer = CostDriverAnalyzer(build(cells))
+
+    tracemalloc.start()
+    counts = analyzer._compute_descendant_counts()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    peak_mb = peak / (1024 * 1024)
+    print(f"Sheet of {WIDE_ROWS} rows: peak {peak_mb:.1f} MB")
+    node_id = analyzer.builder.node_id
+    assert counts[node_id("Sheet1!A1")] == 2
+    assert counts[node_id("Sheet1!C1")] == 1
+    assert counts[node_id("Sheet1!D1")] == 0
+    assert counts[node_id("Sheet1!E1")] == 2 * WIDE_ROWS + 1
+    assert peak_mb < MAX_PEAK_MB, f"peak {peak_mb:.1f} MB exceeds {MAX_PEAK_MB} MB"
+
+
+if __name__ == "__main__":
+    check_against_networkx()
+    check_chain_memory()
+    check_wide_memory()
+    print("OK")
+    sys.exit(0)
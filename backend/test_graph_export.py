@@ -0,0 +1,32 @@
+import asyncio
+import io
+import sys
+from pathlib import Path
+import orjson
+from app.core import DAGBuilder
+from app.services.analysis_service import analysis_service
+
+
+async def main():
+    """export_to_json must decode to the same document as export_to_dict."""
+    for path in sorted(Path('test_files').glob('*.xlsx')):
+        sheets_data = await analysis_service._read_excel(str(path))
+        builder = DAGBuilder()
+        builder.build(sheets_data, include_values=True)
+
+        buffer = io.BytesIO()
+        builder.export_to_json(buffer)
+        streamed = orjson.loads(buffer.getvalue())
+
+        # Values orjson cannot encode natively are written with str()
+        expected = orjson.loads(orjson.dumps(builder.export_to_dict(), default=str))
+
+        print(f"{path.name}: {len(streamed['nodes'])} nodes, {len(streamed['edges'])} edges")
+        assert streamed == expected, path.name
+
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
+    sys.exit(0)
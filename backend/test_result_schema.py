@@ -0,0 +1,40 @@
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+import orjson
+from app.api.routes import completed_payload, validate_result
+from app.models import AnalysisResult
+from app.services.analysis_service import analysis_service
+
+
+async def main():
+    """The raw completed payload must validate against AnalysisResult."""
+    for path in sorted(Path('test_files').glob('*.xlsx')):
+        # Analyse exactly as process_analysis does for a background job
+        result = await analysis_service.analyze_workbook(
+            file_path=str(path), include_values=True, graph_as_json=True
+        )
+        validate_result(result)
+
+        job = {
+            "created_at": datetime.now(),
+            "completed_at": datetime.now(),
+            "file_name": path.name,
+            "file_size": path.stat().st_size,
+            "processing_time": 0.0,
+            "result": result,
+        }
+        content = orjson.dumps(completed_payload("test", job), option=orjson.OPT_NON_STR_KEYS)
+
+        # The bytes served must be what FastAPI would render for the model
+        model = AnalysisResult.model_validate_json(content)
+        assert orjson.loads(content) == orjson.loads(model.model_dump_json()), path.name
+        print(f"{path.name}: {len(model.graph.nodes)} nodes validate")
+
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
+    sys.exit(0)
@@ -0,0 +1,50 @@
+import asyncio
+import glob
+from app.services.analysis_service import analysis_service
+
+async def main():
+    # Compare the Rust reader against the Python readers on every test file
+    try:
+        import excel_reader  # noqa: F401
+    except ImportError:
+        print("Rust extension not installed (cd rust_reader && maturin develop --release)")
+        return
+
+    mismatches = 0
+    for test_file in sorted(glob.glob('test_files/*.xlsx')):
+        print(f"\nChecking: {test_file}")
+        print("=" * 60)
+
+        rust_sheets = analysis_service._read_excel_rust(test_file)
+        python_sheets = await analysis_service._read_excel_fallback(test_file)
+
+        rust_by_name = {sheet['name']: sheet for sheet in rust_sheets}
+        for sheet in python_sheets:
+            rust_sheet = rust_by_name.get(sheet['name'])
+            if rust_sheet is None:
+                print(f"  MISSING SHEET: {sheet['name']}")
+                mismatches += 1
+                continue
+
+            expected = {
+                f"{col}{row}": formula
+                for row, col, formula in zip(sheet['rows'].tolist(), sheet['cols'], sheet['formulas'])
+                if formula
+            }
+            actual = {
+                f"{col}{row}": formula
+                for row, col, formula in zip(rust_sheet['rows'].tolist(), rust_sheet['cols'], rust_sheet['formulas'])
+                if formula
+            }
+
+            for address in sorted(expected.keys() | actual.keys()):
+                if expected.get(address) != actual.get(address):
+                    print(f"  {sheet['name']}!{address}: python={expected.get(address)!r} rust={actual.get(address)!r}")
+                    mismatches += 1
+
+            print(f"  {sheet['name']}: {len(expected)} formulas")
+
+    print(f"\n\nTotal mismatches: {mismatches}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+import asyncio
+import io
+import os
+import sys
+import tempfile
+
+# Small limit so the oversized uploads stay cheap; read when settings load
+os.environ["MAX_FILE_SIZE_MB"] = "1"
+os.environ["UPLOAD_DIR"] = tempfile.mkdtemp()
+
+from fastapi import HTTPException, UploadFile
+from fastapi.testclient import TestClient
+from app.api.routes import save_upload
+from app.main import app
+
+LIMIT = 1024 * 1024
+
+
+def spooled(data):
+    """Upload backed by a spooled temporary file, as Starlette creates it (sendfile path)."""
+    src = tempfile.SpooledTemporaryFile(max_size=LIMIT)
+    src.write(data)
+    src.seek(0)
+    return UploadFile(src, filename="upload.xlsx")
+
+
+def in_memory(data):
+    """Upload without a file descriptor, which takes the chunked fallback."""
+    return UploadFile(io.BytesIO(data), filename="upload.xlsx")
+
+
+async def check_save_upload():
+    """Both copy paths keep the bytes and reject files over the limit with 400."""
+    target = os.path.join(os.environ["UPLOAD_DIR"], "saved.xlsx")
+    for make in (spooled, in_memory):
+        data = os.urandom(LIMIT)
+        size = await save_upload(make(data), target)
+        with open(target, "rb") as f:
+            assert size == LIMIT and f.read() == data, make.__name__
+
+        try:
+            await save_upload(make(data + b"x"), target)
+        except HTTPException as e:
+            assert e.status_code == 400, (make.__name__, e.status_code)
+        else:
+            raise AssertionError(f"{make.__name__}: oversized upload accepted")
+        print(f"{make.__name__}: limit enforced")
+    os.remove(target)
+
+
+def check_endpoint():
+    """The endpoint answers 400 and leaves nothing in UPLOAD_DIR."""
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/analyze",
+            files={"file": ("big.xlsx", os.urandom(LIMIT + 1))},
+        )
+    assert response.status_code == 400, response.status_code
+    assert "File too large" in response.json()["detail"]
+    assert not os.listdir(os.environ["UPLOAD_DIR"])
+    print("endpoint: 400 File too large")
+
+
+if __name__ == "__main__":
+    asyncio.run(check_save_upload())
+    check_endpoint()
+    print("OK")
+    sys.exit(0)